@@ -2,13 +2,21 @@ import json
 import boto3
 import uuid
 
+from common.auth import AuthError, authenticate
+from common.dates import TIMEZONE_HEADER, localize_deadline, normalize_date, parse_datetime
+from common.exams import derived_fields
+from common.timeline import exam_event, load_timeline
+from common.versioning import get_header
+
 dynamodb = boto3.resource('dynamodb')
 exams_table = dynamodb.Table('Exams')
+classes_table = dynamodb.Table('CLASSES')
+submissions_table = dynamodb.Table('Submissions')
 
 def lambda_handler(event, context):
     headers = {
         "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type,user-id,user_id",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user-id,user_id,X-Timezone",
         "Access-Control-Allow-Methods": "OPTIONS,GET,POST",
         "Content-Type": "application/json"
     }
@@ -33,6 +41,15 @@ def lambda_handler(event, context):
             normalized.get("user_id")
         )
 
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                'statusCode': 401,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+
         if not user_id:
             return {
                 'statusCode': 400,
@@ -50,17 +67,48 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': f'Missing required fields: {missing}'})
             }
 
+        # exam_date is the sort key of user_id-exam_date-index, so it is
+        # stored as YYYY-MM-DD for date-range queries
+        try:
+            exam_date = normalize_date(body['exam_date'])
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+
+        try:
+            deadline = localize_deadline(body['deadline'], get_header(event.get('headers'), TIMEZONE_HEADER))
+            parse_datetime(deadline)
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+
         exam_item = {
             'exam_id': str(uuid.uuid4()),
             'user_id': user_id,
             'exam_title': body['exam_title'],
             'description': body['description'],
-            'exam_date': body['exam_date'],
-            'deadline': body['deadline'],
+            'exam_date': exam_date,
+            'deadline': deadline,
             'class_id': body['class_id'],
-            'status': "pending"
+            'status': "pending",
+            'version': 1
         }
 
+        # Collisions are reported, not rejected: an exam normally sits in
+        # its own class slot, and the student decides about the rest
+        conflicts = []
+        exam_slot = exam_event(exam_item)
+        if exam_slot:
+            timeline = load_timeline(classes_table, exams_table, submissions_table, user_id)
+            conflicts = timeline.event_conflicts(exam_slot, exam_item['exam_id'])
+
+        exam_item.update(derived_fields(exam_item))
         exams_table.put_item(Item=exam_item)
 
         return {
@@ -68,7 +116,8 @@ def lambda_handler(event, context):
             'headers': headers,
             'body': json.dumps({
                 'message': 'Exam added successfully',
-                'exam_id': exam_item['exam_id']
+                'exam_id': exam_item['exam_id'],
+                'conflicts': conflicts
             })
         }
 
@@ -2,12 +2,14 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 
+from common.auth import AuthError, authenticate
+
 dynamodb = boto3.resource('dynamodb')
 exams_table = dynamodb.Table('Exams')
 
 def lambda_handler(event, context):
     cors = {
-        "Access-Control-Allow-Headers": "Content-Type,user-id,user_id",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user-id,user_id",
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "OPTIONS,GET,POST,DELETE"
     }
@@ -24,6 +26,15 @@ def lambda_handler(event, context):
 
         user_id = normalized.get("user_id")
 
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": cors,
+                "body": json.dumps({"error": str(e)})
+            }
+
         if not user_id:
             return {
                 "statusCode": 400,
@@ -54,14 +65,31 @@ def lambda_handler(event, context):
             }
 
         # ------------------------------------------------------------
-        # DELETE ITEM (must include BOTH PK & SK)
+        # DELETE ITEM (only if it belongs to this user, no extra read)
         # ------------------------------------------------------------
-        exams_table.delete_item(
-            Key={
-                #updatedd
-                "exam_id": exam_id
+        try:
+            exams_table.delete_item(
+                Key={
+                    "exam_id": exam_id
+                },
+                ConditionExpression="user_id = :uid",
+                ExpressionAttributeValues={":uid": user_id},
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            if e.response.get("Item"):
+                return {
+                    "statusCode": 403,
+                    "headers": cors,
+                    "body": json.dumps({"error": "Unauthorized"})
+                }
+            return {
+                "statusCode": 404,
+                "headers": cors,
+                "body": json.dumps({"error": "Exam not found"})
             }
-        )
 
         return {
             "statusCode": 200,
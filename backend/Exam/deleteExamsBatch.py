@@ -0,0 +1,156 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.transactions import cancellation_codes, delete_action, typed
+
+dynamodb = boto3.resource('dynamodb')
+exams_table = dynamodb.Table('Exams')
+# The low-level client is thread-safe, unlike the resource
+client = dynamodb.meta.client
+
+MAX_EXAMS_PER_REQUEST = 100
+MAX_WORKERS = 10
+
+OWNER_CONDITION = "user_id = :uid"
+
+
+def delete_owned(exam_id, user_id):
+    # One conditional delete, no read. When the condition fails, the old item
+    # (if any) comes back with the error, which tells "not yours" from
+    # "not there".
+    try:
+        client.delete_item(
+            TableName=exams_table.name,
+            Key=typed({"exam_id": exam_id}),
+            ConditionExpression=OWNER_CONDITION,
+            ExpressionAttributeValues=typed({":uid": user_id}),
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+        return {"exam_id": exam_id, "status": "deleted"}
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            return {"exam_id": exam_id, "status": "error", "error": str(e)}
+        if e.response.get("Item"):
+            return {"exam_id": exam_id, "status": "forbidden"}
+        return {"exam_id": exam_id, "status": "not_found"}
+
+
+def lambda_handler(event, context):
+    cors = {
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user-id,user_id",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "OPTIONS,POST,DELETE"
+    }
+
+    try:
+        raw_headers = event.get("headers", {}) or {}
+        normalized = {
+            k.lower().replace('-', '_'): v
+            for k, v in raw_headers.items()
+        }
+
+        user_id = normalized.get("user_id")
+
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": cors,
+                "body": json.dumps({"error": str(e)})
+            }
+
+        if not user_id:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "user_id header is required"})
+            }
+
+        try:
+            body = json.loads(event.get("body") or "{}")
+        except ValueError:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "Invalid JSON body"})
+            }
+
+        exam_ids = body.get("exam_ids")
+        if not isinstance(exam_ids, list) or not exam_ids or not all(isinstance(i, str) and i for i in exam_ids):
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "exam_ids must be a non-empty list of ids"})
+            }
+
+        exam_ids = list(dict.fromkeys(exam_ids))
+        if len(exam_ids) > MAX_EXAMS_PER_REQUEST:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": f"At most {MAX_EXAMS_PER_REQUEST} exams can be deleted per request"})
+            }
+
+        # atomic=true: all or nothing in one transaction
+        if body.get("atomic") == True:
+            try:
+                client.transact_write_items(TransactItems=[
+                    delete_action(exams_table.name, {"exam_id": exam_id}, OWNER_CONDITION, values={":uid": user_id})
+                    for exam_id in exam_ids
+                ])
+            except ClientError as e:
+                codes = cancellation_codes(e)
+                if not codes:
+                    raise
+                failed = [exam_id for exam_id, code in zip(exam_ids, codes) if code == "ConditionalCheckFailed"]
+                return {
+                    "statusCode": 409,
+                    "headers": cors,
+                    "body": json.dumps({
+                        "error": "No exams were deleted",
+                        "not_found_or_forbidden": failed
+                    })
+                }
+
+            return {
+                "statusCode": 200,
+                "headers": cors,
+                "body": json.dumps({
+                    "message": f"{len(exam_ids)} exams deleted",
+                    "deleted": len(exam_ids),
+                    "results": [{"exam_id": exam_id, "status": "deleted"} for exam_id in exam_ids]
+                })
+            }
+
+        # Otherwise each exam is deleted on its own, in parallel
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(exam_ids))) as pool:
+            results = list(pool.map(lambda exam_id: delete_owned(exam_id, user_id), exam_ids))
+
+        deleted = sum(1 for r in results if r["status"] == "deleted")
+        return {
+            "statusCode": 200,
+            "headers": cors,
+            "body": json.dumps({
+                "message": f"{deleted} of {len(exam_ids)} exams deleted",
+                "deleted": deleted,
+                "results": results
+            })
+        }
+
+    except ClientError as e:
+        return {
+            "statusCode": 500,
+            "headers": cors,
+            "body": json.dumps({"error": f"DynamoDB error: {str(e)}"})
+        }
+
+    except Exception as e:
+        return {
+            "statusCode": 500,
+            "headers": cors,
+            "body": json.dumps({"error": str(e)})
+        }
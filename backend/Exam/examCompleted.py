@@ -2,13 +2,33 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 
+from common.auth import AuthError, authenticate
+from common.dates import TIMEZONE_HEADER, localize_deadline, normalize_date, parse_datetime
+from common.derived import update_parts
+from common.exams import sync_derived, update_fields
+from common.serialization import json_default
+from common.timeline import exam_event, load_timeline
+from common.versioning import (
+    VERSION_INCREMENT,
+    VERSION_NAMES,
+    VERSION_VALUES,
+    etag,
+    failed_item,
+    get_header,
+    if_match,
+    version_condition,
+)
+
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Exams")
+classes_table = dynamodb.Table("CLASSES")
+submissions_table = dynamodb.Table("Submissions")
 
 CORS = {
     "Access-Control-Allow-Origin": "*",
-    "Access-Control-Allow-Headers": "Content-Type,user-id,user_id,user-id",
-    "Access-Control-Allow-Methods": "OPTIONS,PUT,GET,POST,DELETE"
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,user-id,user_id,user-id,If-Match,X-Timezone",
+    "Access-Control-Allow-Methods": "OPTIONS,PUT,GET,POST,DELETE",
+    "Access-Control-Expose-Headers": "ETag"
 }
 
 def lambda_handler(event, context):
@@ -17,6 +37,12 @@ def lambda_handler(event, context):
         headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
         user_id = headers.get("user-id") or headers.get("user_id")
 
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {"statusCode": 401, "headers": CORS,
+                    "body": json.dumps({"error": str(e)})}
+
         if not user_id:
             return {"statusCode": 400, "headers": CORS,
                     "body": json.dumps({"error": "user_id header is required"})}
@@ -33,17 +59,6 @@ def lambda_handler(event, context):
             return {"statusCode": 400, "headers": CORS,
                     "body": json.dumps({"error": "exam_id is required"})}
 
-        # Check exam exists
-        item = table.get_item(Key={"exam_id": exam_id}).get("Item")
-        if not item:
-            return {"statusCode": 404, "headers": CORS,
-                    "body": json.dumps({"error": "Exam not found"})}
-
-        # Ensure exam belongs to user
-        if item["user_id"] != user_id:
-            return {"statusCode": 403, "headers": CORS,
-                    "body": json.dumps({"error": "Unauthorized"})}
-
         # Allowed fields
         updatable_fields = [
             "exam_title",
@@ -54,13 +69,6 @@ def lambda_handler(event, context):
             "status"
         ]
 
-        # Explicitly remove exam_datetime if client requests it
-        if body.get("remove_exam_datetime") == True:
-            table.update_item(
-                Key={"exam_id": exam_id},
-                UpdateExpression="REMOVE exam_datetime"
-            )
-
         update_expression_parts = []
         expression_attribute_values = {}
         expression_attribute_names = {}
@@ -68,6 +76,22 @@ def lambda_handler(event, context):
         if body.get("mark_as_complete") == True:
             body["status"] = "completed"
 
+        # Keep exam_date sortable for user_id-exam_date-index
+        if "exam_date" in body:
+            try:
+                body["exam_date"] = normalize_date(body["exam_date"])
+            except ValueError as e:
+                return {"statusCode": 400, "headers": CORS,
+                        "body": json.dumps({"error": str(e)})}
+
+        if "deadline" in body:
+            try:
+                body["deadline"] = localize_deadline(body["deadline"], get_header(event.get("headers"), TIMEZONE_HEADER))
+                parse_datetime(body["deadline"])
+            except ValueError as e:
+                return {"statusCode": 400, "headers": CORS,
+                        "body": json.dumps({"error": str(e)})}
+
                 # Build update expression
         for field in updatable_fields:
             if field in body:
@@ -79,23 +103,93 @@ def lambda_handler(event, context):
                 return {"statusCode": 400, "headers": CORS,
                         "body": json.dumps({"error": "No valid fields to update"})}
 
+        try:
+            expected_version = if_match(event.get("headers"))
+        except ValueError as e:
+            return {"statusCode": 400, "headers": CORS,
+                    "body": json.dumps({"error": str(e)})}
+
+        update_expression_parts.append(VERSION_INCREMENT)
+        expression_attribute_names.update(VERSION_NAMES)
+        expression_attribute_values.update(VERSION_VALUES)
+
+        # The computed fields (epochs, reminder bucket) follow from the changed
+        # fields, so they go in the same write; completing an exam takes it
+        # out of the reminder index
+        remove_fields = []
+        derived = update_fields(body)
+        if derived:
+            set_parts, remove_parts = update_parts(*derived, expression_attribute_names, expression_attribute_values)
+            update_expression_parts.extend(set_parts)
+            remove_fields.extend(remove_parts)
+
         update_expression = "SET " + ", ".join(update_expression_parts)
 
-        result = table.update_item(
-            Key={"exam_id": exam_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values,
-            ExpressionAttributeNames=expression_attribute_names,
-            ReturnValues="ALL_NEW"
-        )
+        # Explicitly remove exam_datetime if client requests it
+        if body.get("remove_exam_datetime") == True:
+            remove_fields.append("exam_datetime")
+
+        if remove_fields:
+            update_expression += " REMOVE " + ", ".join(remove_fields)
+
+        # Existence, ownership and If-Match are checked by the write itself;
+        # on failure the old item (if any) comes back and says which failed
+        condition = "attribute_exists(exam_id) AND user_id = :user_id"
+        expression_attribute_values[":user_id"] = user_id
+        if expected_version is not None:
+            version_check, version_values = version_condition(expected_version)
+            condition += " AND " + version_check
+            expression_attribute_values.update(version_values)
+
+        try:
+            result = table.update_item(
+                Key={"exam_id": exam_id},
+                UpdateExpression=update_expression,
+                ConditionExpression=condition,
+                ExpressionAttributeValues=expression_attribute_values,
+                ExpressionAttributeNames=expression_attribute_names,
+                ReturnValues="ALL_NEW",
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            current = failed_item(e)
+            if not current:
+                return {"statusCode": 404, "headers": CORS,
+                        "body": json.dumps({"error": "Exam not found"})}
+            if current.get("user_id") != user_id:
+                return {"statusCode": 403, "headers": CORS,
+                        "body": json.dumps({"error": "Unauthorized"})}
+            return {"statusCode": 412, "headers": {**CORS, "ETag": etag(current.get("version"))},
+                    "body": json.dumps({"error": "Exam was changed by another request",
+                                        "current_version": current.get("version", 0)},
+                                       default=json_default)}
+
+        updated_exam = result.get("Attributes", {})
+
+        # Only a reopened exam needs its stored deadline back in the reminder
+        # index, with one more write
+        if derived is None:
+            updated_exam = sync_derived(table, {"exam_id": exam_id}, updated_exam)
+
+        # Conflicts are only reported, so they're checked against the item as
+        # written rather than read up front
+        conflicts = []
+        if "deadline" in body or "exam_date" in body or "class_id" in body:
+            exam_slot = exam_event(updated_exam)
+            if exam_slot:
+                timeline = load_timeline(classes_table, table, submissions_table, user_id)
+                conflicts = timeline.event_conflicts(exam_slot, exam_id)
 
         return {
             "statusCode": 200,
-            "headers": CORS,
+            "headers": {**CORS, "ETag": etag(updated_exam.get("version"))},
             "body": json.dumps({
                 "message": "Exam updated successfully",
-                "updated_exam": result.get("Attributes")
-            })                
+                "updated_exam": updated_exam,
+                "conflicts": conflicts
+            }, default=json_default)
         }
 
     except Exception as e:
@@ -1,6 +1,11 @@
 import json
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+
+from common.auth import AuthError, authenticate
+from common.dates import normalize_date
+from common.pagination import parse_limit, projection, query_all, query_page
+from common.serialization import json_default
 
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Exams")
@@ -8,13 +13,24 @@ table = dynamodb.Table("Exams")
 # UNIVERSAL CORS HEADERS (use everywhere)
 CORS = {
     "Access-Control-Allow-Origin": "*",
-    "Access-Control-Allow-Headers": "Content-Type,user-id,user_id",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,user-id,user_id",
     "Access-Control-Allow-Methods": "OPTIONS,GET,POST,PUT,DELETE"
 }
 
-def lambda_handler(event, context):
+EXAM_FIELDS = [
+    "exam_id",
+    "user_id",
+    "exam_title",
+    "description",
+    "exam_date",
+    "deadline",
+    "exam_datetime",
+    "class_id",
+    "status",
+    "version"
+]
 
-    print("EVENT RECEIVED:", json.dumps(event))
+def lambda_handler(event, context):
 
     raw_headers = event.get("headers", {}) or {}
 
@@ -42,6 +58,15 @@ def lambda_handler(event, context):
         except:
             pass
 
+    try:
+        user_id = authenticate(event, user_id)
+    except AuthError as e:
+        return {
+            "statusCode": 401,
+            "headers": CORS,
+            "body": json.dumps({"error": str(e)})
+        }
+
     if not user_id:
         return {
             "statusCode": 400,
@@ -49,14 +74,55 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "user_id is required"})
         }
 
-    # Fetch Exams
-    response = table.query(
-        IndexName="user_id-index",
-        KeyConditionExpression=Key("user_id").eq(user_id)
-    )
+    params = event.get("queryStringParameters") or {}
+
+    # fields=exam_title,exam_date,status only reads those attributes (plus
+    # exam_id); limit/cursor switch to a paged response
+    try:
+        query_kwargs = {
+            "IndexName": "user_id-index",
+            "KeyConditionExpression": Key("user_id").eq(user_id),
+            **projection(params.get("fields"), EXAM_FIELDS, required=["exam_id"])
+        }
+
+        # from/to (YYYY-MM-DD, inclusive) read only that window of
+        # user_id-exam_date-index, in date order
+        date_from = normalize_date(params["from"]) if params.get("from") else None
+        date_to = normalize_date(params["to"]) if params.get("to") else None
+        if date_from or date_to:
+            key = Key("user_id").eq(user_id)
+            if date_from and date_to:
+                key &= Key("exam_date").between(date_from, date_to)
+            elif date_from:
+                key &= Key("exam_date").gte(date_from)
+            else:
+                key &= Key("exam_date").lte(date_to)
+            query_kwargs["IndexName"] = "user_id-exam_date-index"
+            query_kwargs["KeyConditionExpression"] = key
+
+        if params.get("status"):
+            query_kwargs["FilterExpression"] = Attr("status").eq(params["status"])
+
+        if "limit" in params or "cursor" in params:
+            items, next_cursor = query_page(
+                table,
+                limit=parse_limit(params.get("limit")),
+                cursor=params.get("cursor"),
+                **query_kwargs
+            )
+            body = {"data": items, "next_cursor": next_cursor}
+        else:
+            # No paging requested: keep the plain list response, but read every page
+            body = query_all(table, **query_kwargs)
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "headers": CORS,
+            "body": json.dumps({"error": str(e)})
+        }
 
     return {
         "statusCode": 200,
         "headers": CORS,
-        "body": json.dumps(response["Items"])
+        "body": json.dumps(body, default=json_default)
     }
@@ -4,15 +4,23 @@ import uuid
 from botocore.exceptions import ClientError
 from datetime import datetime
 
+from common.auth import AuthError, authenticate
+from common.dates import TIMEZONE_HEADER, localize_deadline, parse_datetime
+from common.submissions import derived_fields
+from common.timeline import load_timeline, submission_event
+from common.versioning import get_header
+
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Submissions")
+classes_table = dynamodb.Table("CLASSES")
+exams_table = dynamodb.Table("Exams")
 
 def lambda_handler(event, context):
 
 
     cors = {
         "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type,user_id,user-id",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id,user-id,X-Timezone",
         "Access-Control-Allow-Methods": "OPTIONS,POST,"
     }
 
@@ -34,6 +42,15 @@ def lambda_handler(event, context):
 
         user_id = headers_normalized.get("user_id")
 
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": cors,
+                "body": json.dumps({"error": str(e)})
+            }
+
         if not user_id:
             return {
                 "statusCode": 400,
@@ -80,8 +97,17 @@ def lambda_handler(event, context):
             }
 
         try:
-            datetime.fromisoformat(deadline)
-        except:
+            deadline = localize_deadline(deadline, get_header(event.get("headers"), TIMEZONE_HEADER))
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": str(e)})
+            }
+
+        try:
+            parse_datetime(deadline)
+        except ValueError:
             return {
                 "statusCode": 400,
                 "headers": cors,
@@ -100,9 +126,18 @@ def lambda_handler(event, context):
             "submission_date": submission_date,
             "deadline": deadline,
             "class_id": class_id,
-            "status": status
+            "status": status,
+            "version": 1
         }
 
+        # Reported back to the client; a deadline during a class is allowed
+        conflicts = []
+        deadline_slot = submission_event(item)
+        if deadline_slot:
+            timeline = load_timeline(classes_table, exams_table, table, user_id)
+            conflicts = timeline.event_conflicts(deadline_slot, task_id)
+
+        item.update(derived_fields(item))
         table.put_item(Item=item)
 
         return {
@@ -111,7 +146,8 @@ def lambda_handler(event, context):
             "body": json.dumps({
                 "message": "Submission created successfully.",
                 "task_id": task_id,
-                "data": item
+                "data": item,
+                "conflicts": conflicts
             })
         }
 
@@ -0,0 +1,149 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.serialization import json_default
+from common.submissions import user_status
+from common.transactions import typed
+from common.versioning import VERSION_INCREMENT, VERSION_NAMES, VERSION_VALUES, failed_item
+
+dynamodb = boto3.resource("dynamodb")
+# The low-level client is thread-safe, unlike the resource
+client = dynamodb.meta.client
+
+MAX_ITEMS_PER_REQUEST = 100
+MAX_WORKERS = 10
+
+# Sets status, bumps the version and drops the item from the reminder index,
+# all in one conditional write; submissions also move in the status index
+COMPLETE_EXPRESSION = f"SET #status = :completed, {VERSION_INCREMENT} REMOVE due_bucket, due_at"
+COMPLETE_NAMES = {"#status": "status", **VERSION_NAMES}
+COMPLETE_SUBMISSION_EXPRESSION = (
+    f"SET #status = :completed, #user_status = :user_status, {VERSION_INCREMENT} REMOVE due_bucket, due_at"
+)
+
+
+def complete_exam(exam_id, user_id):
+    try:
+        client.update_item(
+            TableName="Exams",
+            Key=typed({"exam_id": exam_id}),
+            UpdateExpression=COMPLETE_EXPRESSION,
+            ConditionExpression="attribute_exists(exam_id) AND user_id = :user_id",
+            ExpressionAttributeNames=COMPLETE_NAMES,
+            ExpressionAttributeValues=typed({":completed": "completed", ":user_id": user_id, **VERSION_VALUES}),
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            return {"type": "exam", "id": exam_id, "status": "error", "error": e.response["Error"]["Message"]}
+        return {"type": "exam", "id": exam_id, "status": "forbidden" if failed_item(e) else "not_found"}
+    return {"type": "exam", "id": exam_id, "status": "completed"}
+
+
+def complete_submission(task_id, user_id):
+    try:
+        client.update_item(
+            TableName="Submissions",
+            Key=typed({"task_id": task_id, "user_id": user_id}),
+            UpdateExpression=COMPLETE_SUBMISSION_EXPRESSION,
+            ConditionExpression="attribute_exists(task_id)",
+            ExpressionAttributeNames={**COMPLETE_NAMES, "#user_status": "user_status"},
+            ExpressionAttributeValues=typed({
+                ":completed": "completed",
+                ":user_status": user_status(user_id, "completed"),
+                **VERSION_VALUES
+            })
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            return {"type": "submission", "id": task_id, "status": "error", "error": e.response["Error"]["Message"]}
+        return {"type": "submission", "id": task_id, "status": "not_found"}
+    return {"type": "submission", "id": task_id, "status": "completed"}
+
+
+def lambda_handler(event, context):
+    cors = {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id,user-id",
+        "Access-Control-Allow-Methods": "OPTIONS,POST,PUT",
+    }
+
+    try:
+        headers = {k.lower().replace("-", "_"): v for k, v in (event.get("headers") or {}).items()}
+        user_id = headers.get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": cors,
+                "body": json.dumps({"error": str(e)})
+            }
+
+        if not user_id:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "user_id header is required"})
+            }
+
+        try:
+            body = json.loads(event.get("body") or "{}")
+        except ValueError:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "Invalid JSON body"})
+            }
+
+        task_ids = body.get("task_ids") or []
+        exam_ids = body.get("exam_ids") or []
+        if not isinstance(task_ids, list) or not isinstance(exam_ids, list) \
+                or not all(isinstance(i, str) and i for i in task_ids + exam_ids):
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "task_ids and exam_ids must be lists of ids"})
+            }
+
+        jobs = [(complete_submission, task_id) for task_id in dict.fromkeys(task_ids)] + \
+               [(complete_exam, exam_id) for exam_id in dict.fromkeys(exam_ids)]
+        if not jobs:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": "task_ids or exam_ids is required"})
+            }
+        if len(jobs) > MAX_ITEMS_PER_REQUEST:
+            return {
+                "statusCode": 400,
+                "headers": cors,
+                "body": json.dumps({"error": f"At most {MAX_ITEMS_PER_REQUEST} items can be completed per request"})
+            }
+
+        # Each item is its own conditional write, so one missing item doesn't
+        # stop the rest
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs))) as pool:
+            results = list(pool.map(lambda job: job[0](job[1], user_id), jobs))
+
+        completed = sum(1 for r in results if r["status"] == "completed")
+        return {
+            "statusCode": 200,
+            "headers": cors,
+            "body": json.dumps({
+                "message": f"{completed} of {len(jobs)} items marked as completed",
+                "completed": completed,
+                "failed": len(jobs) - completed,
+                "results": results
+            }, default=json_default)
+        }
+
+    except Exception as e:
+        return {
+            "statusCode": 500,
+            "headers": cors,
+            "body": json.dumps({"error": str(e)})
+        }
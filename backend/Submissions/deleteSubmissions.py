@@ -2,12 +2,14 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 
+from common.auth import AuthError, authenticate
+
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Submissions")
 
 def lambda_handler(event, context):
     headers = {
-        "Access-Control-Allow-Headers": "Content-Type,user_id",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id",
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "OPTIONS,GET,POST,DELETE",
     }
@@ -17,6 +19,15 @@ def lambda_handler(event, context):
         if event.get('headers'):
             user_id = event['headers'].get('user_id')
         
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": headers,
+                "body": json.dumps({"error": str(e)})
+            }
+
         if not user_id:
             return {
                 "statusCode": 400,
@@ -42,30 +53,13 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "task_id is required in query parameters or request body"})
             }
 
-        try:
-            response = table.get_item(Key={
-                "task_id": task_id,     
-                "user_id": user_id       
-            })
-            
-            if 'Item' not in response:
-                return {
-                    "statusCode": 404,
-                    "headers": headers,
-                    "body": json.dumps({"error": "Submission not found for this user"})
-                }
-                
-        except ClientError as e:
-            return {
-                "statusCode": 500,
-                "headers": headers,
-                "body": json.dumps({"error": f"Error checking submission: {str(e)}"})
-            }
-
-        table.delete_item(Key={
-            "task_id": task_id,      
-            "user_id": user_id       
-        })
+        table.delete_item(
+            Key={
+                "task_id": task_id,
+                "user_id": user_id
+            },
+            ConditionExpression="attribute_exists(task_id)"
+        )
 
         return {
             "statusCode": 200,
@@ -85,7 +79,7 @@ def lambda_handler(event, context):
             return {
                 "statusCode": 404,
                 "headers": headers,
-                "body": json.dumps({"error": "Submission not found"})
+                "body": json.dumps({"error": "Submission not found for this user"})
             }
         else:
             return {
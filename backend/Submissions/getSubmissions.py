@@ -1,19 +1,28 @@
 import json
 import boto3
-from boto3.dynamodb.conditions import Attr
+from datetime import datetime
+from boto3.dynamodb.conditions import Key
+
+from common.auth import AuthError, authenticate
+from common.pagination import parse_limit, query_all, query_page
+from common.serialization import json_default
+from common.submissions import STATUS_INDEX, status_key
+from common.versioning import etag, get_header, parse_etag
 
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Submissions")
 
-def build_response(status_code, body):
+def build_response(status_code, body, extra_headers=None):
     return {
         "statusCode": status_code,
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,user_id,user-id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id,user-id,If-None-Match",
+            "Access-Control-Expose-Headers": "ETag",
+            **(extra_headers or {})
         },
-        "body": json.dumps(body)
+        "body": json.dumps(body, default=json_default)
     }
 
 def lambda_handler(event, context):
@@ -22,6 +31,11 @@ def lambda_handler(event, context):
         headers = {k.lower().replace("-", "_"): v for k, v in (event.get("headers") or {}).items()}
         user_id = headers.get("user_id")
 
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {"error": str(e)})
+
         if not user_id:
             return build_response(400, {"error": "user_id header is required"})
 
@@ -32,15 +46,69 @@ def lambda_handler(event, context):
         if task_id:
             resp = table.get_item(Key={"task_id": task_id, "user_id": user_id})
             if "Item" in resp:
-                return build_response(200, resp["Item"])
+                tag = etag(resp["Item"].get("version"))
+
+                # The client's cached copy is still current
+                try:
+                    cached_version = parse_etag(get_header(event.get("headers"), "If-None-Match"))
+                except ValueError:
+                    cached_version = None
+                if cached_version is not None and etag(cached_version) == tag:
+                    return {
+                        "statusCode": 304,
+                        "headers": {
+                            "Access-Control-Allow-Origin": "*",
+                            "Access-Control-Expose-Headers": "ETag",
+                            "ETag": tag
+                        },
+                        "body": ""
+                    }
+
+                return build_response(200, resp["Item"], {"ETag": tag})
             return build_response(404, {"error": "Submission not found"})
 
-        # CASE 2: Get all submissions for user
-        resp = table.scan(
-            FilterExpression=Attr("user_id").eq(user_id)
-        )
+        # CASE 2: One status in deadline order, from user_status-deadline_sort-index.
+        # status=pending, deadline_from / deadline_to (ISO, inclusive) and
+        # upcoming=N (the next N pending deadlines from now) only read the
+        # matching items; without them every submission is returned as before.
+        query_kwargs = {"IndexName": "user_id-index", "KeyConditionExpression": Key("user_id").eq(user_id)}
+
+        upcoming = params.get("upcoming")
+        if params.get("status") or params.get("deadline_from") or params.get("deadline_to") or upcoming:
+            status = params.get("status") or "pending"
+            deadline_from = params.get("deadline_from")
+            if upcoming and not deadline_from:
+                deadline_from = datetime.utcnow().replace(microsecond=0).isoformat()
+            try:
+                query_kwargs = {
+                    "IndexName": STATUS_INDEX,
+                    "KeyConditionExpression": status_key(user_id, status, deadline_from, params.get("deadline_to"))
+                }
+            except ValueError as e:
+                return build_response(400, {"error": str(e)})
+
+            if upcoming:
+                try:
+                    items, _ = query_page(table, limit=parse_limit(upcoming), **query_kwargs)
+                except ValueError as e:
+                    return build_response(400, {"error": str(e)})
+                return build_response(200, items)
+
+        if "limit" in params or "cursor" in params:
+            try:
+                items, next_cursor = query_page(
+                    table,
+                    limit=parse_limit(params.get("limit")),
+                    cursor=params.get("cursor"),
+                    **query_kwargs
+                )
+            except ValueError as e:
+                return build_response(400, {"error": str(e)})
+
+            return build_response(200, {"data": items, "next_cursor": next_cursor})
 
-        items = resp.get("Items", [])
+        # No paging requested: keep the plain list response, but read every page
+        items = query_all(table, **query_kwargs)
         return build_response(200, items)
 
     except Exception as e:
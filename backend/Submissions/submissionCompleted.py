@@ -2,12 +2,17 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 
+from common.auth import AuthError, authenticate
+from common.serialization import json_default
+from common.submissions import user_status
+from common.versioning import etag
+
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Submissions")
 
 def lambda_handler(event, context):
     headers = {
-        "Access-Control-Allow-Headers": "Content-Type,user_id",  
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id",  
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "OPTIONS,PUT,POST,GET,DELETE",
     }
@@ -15,6 +20,15 @@ def lambda_handler(event, context):
     try:
         # Get user_id from headers
         user_id = event.get('headers', {}).get('user_id')
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": headers,
+                "body": json.dumps({"error": str(e)})
+            }
+
         if not user_id:
             return {
                 "statusCode": 400,
@@ -33,38 +47,29 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "task_id is required"})
             }
 
-        try:
-            response = table.get_item(Key={
-                "task_id": task_id,
-                "user_id": user_id
-            })
-            
-            if 'Item' not in response:
-                return {
-                    "statusCode": 404,
-                    "headers": headers,
-                    "body": json.dumps({"error": "Submission not found for this user"})
-                }
-                
-        except ClientError as e:
-            return {
-                "statusCode": 500,
-                "headers": headers,
-                "body": json.dumps({"error": f"Error checking submission: {str(e)}"})
-            }
-
-        # Mark as completed
+        # Mark as completed; the key includes user_id, so existence is the
+        # only condition needed
         response = table.update_item(
             Key={
                 "task_id": task_id,
                 "user_id": user_id
             },
-            UpdateExpression="SET #status = :status",
+            # Completed submissions move to the completed part of the status
+            # index and drop out of the reminder index, in the same write
+            UpdateExpression="SET #status = :status, #user_status = :user_status, "
+                             "#version = if_not_exists(#version, :zero) + :one "
+                             "REMOVE due_bucket, due_at",
+            ConditionExpression="attribute_exists(task_id)",
             ExpressionAttributeNames={
-                "#status": "status"
+                "#status": "status",
+                "#user_status": "user_status",
+                "#version": "version"
             },
             ExpressionAttributeValues={
-                ":status": "completed"
+                ":status": "completed",
+                ":user_status": user_status(user_id, "completed"),
+                ":zero": 0,
+                ":one": 1
             },
             ReturnValues="ALL_NEW"
         )
@@ -73,11 +78,11 @@ def lambda_handler(event, context):
 
         return {
             "statusCode": 200,
-            "headers": headers,
+            "headers": {**headers, "ETag": etag(updated_item.get("version"))},
             "body": json.dumps({
                 "message": "Submission marked as completed!",
                 "updated_submission": updated_item
-            })
+            }, default=json_default)
         }
 
     except ClientError as e:
@@ -92,8 +97,13 @@ def lambda_handler(event, context):
             return {
                 "statusCode": 404,
                 "headers": headers,
-                "body": json.dumps({"error": "Submission not found"})
+                "body": json.dumps({"error": "Submission not found for this user"})
             }
+        return {
+            "statusCode": 500,
+            "headers": headers,
+            "body": json.dumps({"error": f"DynamoDB error: {error_msg}"})
+        }
     except Exception as e:
         return {
             "statusCode": 500,
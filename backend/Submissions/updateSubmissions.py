@@ -3,19 +3,48 @@ import boto3
 from botocore.exceptions import ClientError
 from datetime import datetime
 
+from common.auth import AuthError, authenticate
+from common.serialization import json_default
+from common.dates import TIMEZONE_HEADER, is_time_of_day, localize_deadline, parse_datetime
+from common.derived import update_parts
+from common.submissions import sync_derived, update_fields
+from common.timeline import load_timeline, submission_event
+from common.versioning import (
+    VERSION_INCREMENT,
+    VERSION_NAMES,
+    VERSION_VALUES,
+    etag,
+    failed_item,
+    get_header,
+    if_match,
+    version_condition,
+)
+
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("Submissions")
+classes_table = dynamodb.Table("CLASSES")
+exams_table = dynamodb.Table("Exams")
 
 def lambda_handler(event, context):
     headers = {
-        "Access-Control-Allow-Headers": "Content-Type,user_id,user-id",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id,user-id,If-Match,X-Timezone",
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "OPTIONS,PUT,POST,GET,DELETE",
+        "Access-Control-Expose-Headers": "ETag",
     }
 
     try:
         # ---- USER ID CHECK ----
         user_id = event.get("headers", {}).get("user_id") or event.get("headers", {}).get("user-id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return {
+                "statusCode": 401,
+                "headers": headers,
+                "body": json.dumps({"error": str(e)})
+            }
+
         if not user_id:
             return {
                 "statusCode": 400,
@@ -34,15 +63,6 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "task_id is required"})
             }
 
-        # ---- CHECK IF SUBMISSION EXISTS ----
-        response = table.get_item(Key={"task_id": task_id, "user_id": user_id})
-        if "Item" not in response:
-            return {
-                "statusCode": 404,
-                "headers": headers,
-                "body": json.dumps({"error": "Submission not found for this user"})
-            }
-
         # ---- PREPARE UPDATE ----
         update_expression = "SET "
         expression_attribute_values = {}
@@ -62,21 +82,21 @@ def lambda_handler(event, context):
                 }
 
         if "deadline" in body:
+            try:
+                body["deadline"] = localize_deadline(body["deadline"], get_header(event.get("headers"), TIMEZONE_HEADER))
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": headers,
+                    "body": json.dumps({"error": str(e)})
+                }
+
             try:
                 dt = body["deadline"]
 
-                if "T" in dt:
-                    # Full ISO datetime: YYYY-MM-DDTHH:MM:SS
-                    datetime.strptime(dt, "%Y-%m-%dT%H:%M:%S")
-                else:
-                    # TIME ONLY
-                    parts = dt.split(":")
-                    if len(parts) == 2:
-                        datetime.strptime(dt, "%H:%M")
-                    elif len(parts) == 3:
-                        datetime.strptime(dt, "%H:%M:%S")
-                    else:
-                        raise ValueError()
+                # Full ISO datetime, or a time only (no deadline_epoch then)
+                if not is_time_of_day(dt):
+                    parse_datetime(dt)
 
             except ValueError:
                 return {
@@ -103,26 +123,91 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "No updatable fields provided"})
             }
 
-        update_expression += ", ".join(set_parts)
+        try:
+            expected_version = if_match(event.get("headers"))
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "headers": headers,
+                "body": json.dumps({"error": str(e)})
+            }
+
+        set_parts.append(VERSION_INCREMENT)
+        expression_attribute_names.update(VERSION_NAMES)
+        expression_attribute_values.update(VERSION_VALUES)
 
-        # ---- UPDATE DYNAMODB ----
-        response = table.update_item(
-            Key={"task_id": task_id, "user_id": user_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values,
-            ExpressionAttributeNames=expression_attribute_names,
-            ReturnValues="ALL_NEW"
-        )
+        # The computed fields (user_status, deadline_sort, the reminder
+        # bucket and the epochs) follow from the changed fields, so they go
+        # in the same write
+        remove_parts = []
+        derived = update_fields(user_id, body)
+        if derived:
+            derived_set, remove_parts = update_parts(*derived, expression_attribute_names, expression_attribute_values)
+            set_parts.extend(derived_set)
+
+        update_expression += ", ".join(set_parts)
+        if remove_parts:
+            update_expression += " REMOVE " + ", ".join(remove_parts)
+
+        condition = "attribute_exists(task_id)"
+        if expected_version is not None:
+            version_check, version_values = version_condition(expected_version)
+            condition += " AND " + version_check
+            expression_attribute_values.update(version_values)
+
+        # ---- UPDATE DYNAMODB (only if the submission exists, at If-Match) ----
+        try:
+            response = table.update_item(
+                Key={"task_id": task_id, "user_id": user_id},
+                UpdateExpression=update_expression,
+                ConditionExpression=condition,
+                ExpressionAttributeValues=expression_attribute_values,
+                ExpressionAttributeNames=expression_attribute_names,
+                ReturnValues="ALL_NEW",
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            current = failed_item(e)
+            if current:
+                return {
+                    "statusCode": 412,
+                    "headers": {**headers, "ETag": etag(current.get("version"))},
+                    "body": json.dumps({
+                        "error": "Submission was changed by another request",
+                        "current_version": current.get("version", 0)
+                    }, default=json_default)
+                }
+            return {
+                "statusCode": 404,
+                "headers": headers,
+                "body": json.dumps({"error": "Submission not found for this user"})
+            }
 
         updated_item = response.get("Attributes", {})
 
+        # Only a reopened submission needs its stored deadline back in the
+        # reminder index, with one more write
+        if derived is None:
+            updated_item = sync_derived(table, {"task_id": task_id, "user_id": user_id}, updated_item)
+
+        # Time-only deadlines can't be placed on the calendar and are skipped
+        conflicts = []
+        if "deadline" in body or "class_id" in body:
+            deadline_slot = submission_event(updated_item)
+            if deadline_slot:
+                timeline = load_timeline(classes_table, exams_table, table, user_id)
+                conflicts = timeline.event_conflicts(deadline_slot, task_id)
+
         return {
             "statusCode": 200,
-            "headers": headers,
+            "headers": {**headers, "ETag": etag(updated_item.get("version"))},
             "body": json.dumps({
                 "message": "Submission updated successfully!",
-                "updated_submission": updated_item
-            })
+                "updated_submission": updated_item,
+                "conflicts": conflicts
+            }, default=json_default)
         }
 
     except ClientError as e:
@@ -0,0 +1,120 @@
+import boto3
+import json
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.avatars import (
+    ALLOWED_TYPES,
+    BUCKET_NAME,
+    MAX_AVATAR_BYTES,
+    current_variants,
+    delete_upload,
+    key_from_url,
+    object_url,
+    s3_client,
+    user_prefix,
+)
+from common.serialization import json_default
+from common.users import USERS_TABLE
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "OPTIONS,POST",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
+        },
+        "body": json.dumps(body_dict, default=json_default)
+    }
+
+s3 = s3_client()
+dynamodb = boto3.resource("dynamodb")
+TABLE_NAME = USERS_TABLE
+
+def lambda_handler(event, context):
+    # Step 2 of an avatar change: the client reports the uploaded key, and
+    # the user's image is pointed at it. Only the object's metadata is read.
+    try:
+        table = dynamodb.Table(TABLE_NAME)
+
+        user_id = (event.get("headers") or {}).get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user-id header is required"
+            })
+
+        body = event.get("body") or "{}"
+        data = json.loads(body) if isinstance(body, str) else body
+
+        key = data.get("key")
+        if not isinstance(key, str) or not key.startswith(user_prefix(user_id)) or ".." in key:
+            return build_response(400, {
+                "status": "error",
+                "message": "key must be one returned by avatarUploadUrl for this user"
+            })
+
+        try:
+            head = s3.head_object(Bucket=BUCKET_NAME, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return build_response(404, {
+                    "status": "error",
+                    "message": "Upload not found."
+                })
+            raise
+
+        if head.get("ContentType") not in ALLOWED_TYPES or head.get("ContentLength", 0) > MAX_AVATAR_BYTES:
+            return build_response(400, {
+                "status": "error",
+                "message": "Uploaded file is not an allowed image."
+            })
+
+        image_url = object_url(key)
+        try:
+            response = table.update_item(
+                Key={"user_id": user_id},
+                UpdateExpression="SET image = :image",
+                ConditionExpression="attribute_exists(user_id)",
+                ExpressionAttributeValues={":image": image_url},
+                ReturnValues="ALL_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return build_response(404, {
+                "status": "error",
+                "message": "User not found."
+            })
+
+        previous = response.get("Attributes", {})
+
+        # The replaced upload and its variants are no longer referenced
+        previous_key = key_from_url(previous.get("image"))
+        if previous_key and previous_key != key and previous_key.startswith(user_prefix(user_id)):
+            delete_upload(s3, previous_key)
+
+        return build_response(200, {
+            "status": "success",
+            "message": "Avatar updated successfully",
+            "image": image_url,
+            # Resized copies, if processAvatar has already made them; null
+            # until then, and clients keep using image
+            "image_variants": current_variants({**previous, "image": image_url})
+        })
+
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
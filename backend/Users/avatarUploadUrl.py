@@ -0,0 +1,74 @@
+import json
+
+from common.auth import AuthError, authenticate
+from common.avatars import (
+    ALLOWED_TYPES,
+    MAX_AVATAR_BYTES,
+    UPLOAD_EXPIRES_SECONDS,
+    new_avatar_key,
+    presigned_avatar_post,
+    s3_client,
+)
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "OPTIONS,POST",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
+        },
+        "body": json.dumps(body_dict)
+    }
+
+s3 = s3_client()
+
+def lambda_handler(event, context):
+    # Step 1 of an avatar change: returns a presigned POST the client sends
+    # the image to directly, then reports the key to avatarUploadComplete
+    try:
+        user_id = (event.get("headers") or {}).get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user-id header is required"
+            })
+
+        body = event.get("body") or "{}"
+        data = json.loads(body) if isinstance(body, str) else body
+
+        content_type = data.get("content_type")
+        if content_type not in ALLOWED_TYPES:
+            return build_response(400, {
+                "status": "error",
+                "message": "content_type must be one of: " + ", ".join(ALLOWED_TYPES)
+            })
+
+        key = new_avatar_key(user_id, content_type)
+        upload = presigned_avatar_post(s3, key, content_type)
+
+        return build_response(200, {
+            "status": "success",
+            "upload": {
+                "url": upload["url"],
+                "fields": upload["fields"]
+            },
+            "key": key,
+            "max_bytes": MAX_AVATAR_BYTES,
+            "expires_in": UPLOAD_EXPIRES_SECONDS
+        })
+
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -0,0 +1,114 @@
+import boto3
+import json
+from botocore.exceptions import ClientError
+from urllib.parse import unquote_plus
+
+from common.avatars import (
+    BUCKET_NAME,
+    VARIANT_FORMATS,
+    VARIANT_SIZES,
+    object_url,
+    parse_avatar_key,
+    s3_client,
+    variant_key,
+    variant_urls,
+)
+from common.thumbnails import HAS_PILLOW, render_variants
+from common.users import USERS_TABLE
+
+s3 = s3_client()
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table(USERS_TABLE)
+
+# Variant keys are unique per upload, so they never change once written
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def record_variants(user_id, source_url, uploaded_at, urls):
+    # Only ever replaces variants of an older upload, so a slow run for a
+    # previous avatar cannot overwrite the newer one's
+    try:
+        table.update_item(
+            Key={"user_id": user_id},
+            UpdateExpression="SET image_variants = :variants",
+            ConditionExpression=(
+                "attribute_exists(user_id) AND "
+                "(attribute_not_exists(image_variants) OR image_variants.uploaded_at <= :uploaded_at)"
+            ),
+            ExpressionAttributeValues={
+                ":variants": {"source": source_url, "uploaded_at": uploaded_at, **urls},
+                ":uploaded_at": uploaded_at
+            }
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+
+
+def process(key):
+    parsed = parse_avatar_key(key)
+    if parsed is None:
+        return "ignored"
+    user_id, upload_id = parsed
+
+    try:
+        obj = s3.get_object(Bucket=BUCKET_NAME, Key=key)
+    except ClientError as e:
+        # Replaced and deleted before this ran
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return "missing"
+        raise
+
+    try:
+        rendered = render_variants(obj["Body"].read(), VARIANT_SIZES, list(VARIANT_FORMATS))
+    except ValueError as e:
+        print(json.dumps({"key": key, "error": str(e)}))
+        return "invalid"
+
+    # Sources smaller than every size are served as they are
+    if not rendered:
+        return "too_small"
+
+    for (size, fmt), data in rendered.items():
+        s3.put_object(
+            Bucket=BUCKET_NAME,
+            Key=variant_key(user_id, upload_id, size, fmt),
+            Body=data,
+            ContentType=VARIANT_FORMATS[fmt][1],
+            CacheControl=VARIANT_CACHE_CONTROL
+        )
+
+    uploaded_at = int(obj["LastModified"].timestamp())
+    sizes = sorted({size for size, _ in rendered})
+    if not record_variants(user_id, object_url(key), uploaded_at, variant_urls(user_id, upload_id, sizes)):
+        # A newer upload has its variants recorded already (or the user is
+        # gone), so nothing will ever point at these
+        s3.delete_objects(
+            Bucket=BUCKET_NAME,
+            Delete={"Objects": [{"Key": variant_key(user_id, upload_id, size, fmt)} for size, fmt in rendered],
+                    "Quiet": True}
+        )
+        return "stale"
+    return "processed"
+
+
+def lambda_handler(event, context):
+    # S3 ObjectCreated trigger on the characters/ prefix. Each upload gets a
+    # square copy per VARIANT_SIZES (up to its own size) in every
+    # VARIANT_FORMATS, and their URLs are recorded on the user as
+    # image_variants.
+    if not HAS_PILLOW:
+        # Without the layer the originals are still served; nothing to retry
+        print(json.dumps({"error": "Pillow is not installed; avatar variants were not made"}))
+        return {"statusCode": 200, "body": json.dumps({"results": {}})}
+
+    results = {}
+    for record in (event or {}).get("Records", []):
+        # Keys arrive URL-encoded in S3 notifications
+        key = unquote_plus(record["s3"]["object"]["key"])
+        results[key] = process(key)
+
+    print(json.dumps({"results": results}))
+    return {"statusCode": 200, "body": json.dumps({"results": results})}
@@ -1,5 +1,10 @@
 import boto3
 import json
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.transactions import cancellation_codes, delete_action
+from common.users import USERS_TABLE, normalize_email, release_email_action
 
 def build_response(status_code, body_dict):
     return {
@@ -8,18 +13,26 @@ def build_response(status_code, body_dict):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "OPTIONS,POST",
-            "Access-Control-Allow-Headers": "Content-Type,user_id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
         },
         "body": json.dumps(body_dict)
     }
 
 dynamodb = boto3.resource("dynamodb")
-TABLE_NAME = "users"
+TABLE_NAME = USERS_TABLE
 
 def lambda_handler(event, context):
     try:
         table = dynamodb.Table(TABLE_NAME)
         user_id = event.get("headers", {}).get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error",
@@ -30,11 +43,36 @@ def lambda_handler(event, context):
         if not existUser:
             return build_response(404, {
                 "status": "error",
-                "message": f"User Not Found\n{str(e)}"
+                "message": "User Not Found"
             })
-        
+
+        # The user and its USER_EMAILS claim go together, so the email can be
+        # registered again. The delete is conditioned on the email read above,
+        # in case an update moved the claim in between.
+        email = existUser.get("email")
+        actions = [
+            delete_action(
+                TABLE_NAME,
+                {"user_id": user_id},
+                "email = :email" if email else "attribute_exists(user_id) AND attribute_not_exists(email)",
+                values={":email": email} if email else None
+            )
+        ]
+        if email:
+            actions.append(release_email_action(normalize_email(email), user_id))
+
         try:
-            table.delete_item(Key={"user_id": user_id})
+            dynamodb.meta.client.transact_write_items(TransactItems=actions)
+        except ClientError as e:
+            if cancellation_codes(e):
+                return build_response(409, {
+                    "status": "error",
+                    "message": "User was changed by another request, please retry."
+                })
+            return build_response(500, {
+                "status": "error",
+                "message": f"DynamoDB delete failed: {str(e)}"
+            })
         except Exception as e:
             return build_response(500, {
                 "status": "error",
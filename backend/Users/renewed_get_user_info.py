@@ -1,6 +1,10 @@
 import boto3
 import json
 
+from common.auth import AuthError, authenticate
+from common.avatars import current_variants
+from common.serialization import json_default
+
 def build_response(status_code, body_dict):
     return {
         "statusCode": status_code,
@@ -8,9 +12,9 @@ def build_response(status_code, body_dict):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "OPTIONS,POST",
-            "Access-Control-Allow-Headers": "Content-Type,user_id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
         },
-        "body": json.dumps(body_dict)
+        "body": json.dumps(body_dict, default=json_default)
     }
 
 dynamodb = boto3.resource("dynamodb")
@@ -20,6 +24,14 @@ def lambda_handler(event, context):
     try:
         table = dynamodb.Table(TABLE_NAME)
         user_id = event.get("headers", {}).get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error",
@@ -41,6 +53,10 @@ def lambda_handler(event, context):
                 "status": "error",
                 "message": f"User Not Found\n{str(e)}"
             })
+        # Variants of a previous avatar are not shown with the new one
+        if "image_variants" in item:
+            item["image_variants"] = current_variants(item)
+
         return build_response(200, {
             "status": "success",
             "user": item
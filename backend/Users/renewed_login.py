@@ -4,7 +4,10 @@ import hashlib
 import hmac
 import os
 
-TABLE_NAME = "users"
+from common.auth import issue_token
+from common.users import USERS_TABLE, find_user_by_email
+
+TABLE_NAME = USERS_TABLE
 dynamodb = boto3.resource("dynamodb")
 SECRET_KEY = os.environ.get("SECRET_KEY", "my_secret_key")
 
@@ -37,21 +40,27 @@ def lambda_handler(event, context):
         return build_response(400, {"status": "error", "message": "Email and password required."})
 
     try:
-        response = table.get_item(Key={"email": entered_email})
-        item = response.get("Item")
+        # users is keyed by user_id; the email index finds the account in
+        # one read
+        item = find_user_by_email(table, entered_email)
         if not item:
             return build_response(404, {"status": "error", "message": "User not found"})
 
-        stored_email = item.get("email")
         stored_hash = item.get("password_hash")
 
-        if entered_email != stored_email:
-            return build_response(401, {"status": "error", "message": "Email does not match."})
-
         if not verify_password(entered_password, stored_hash):
             return build_response(401, {"status": "error", "message": "Incorrect password."})
 
-        return build_response(200, {"status": "success", "message": "Authentication successful.", "user": {"user_id": item["user_id"], "email": item["email"]}})
+        # Sent back as "Authorization: Bearer <token>"; handlers verify it
+        # without a lookup
+        token, expires_at = issue_token(item["user_id"])
+        return build_response(200, {
+            "status": "success",
+            "message": "Authentication successful.",
+            "user": {"user_id": item["user_id"], "email": item["email"]},
+            "token": token,
+            "expires_at": expires_at
+        })
     
     except Exception as e:
         return build_response(500, {"status": "error", "message": str(e)})
@@ -4,6 +4,10 @@ import hashlib
 import hmac
 import os
 import uuid
+from botocore.exceptions import ClientError
+
+from common.transactions import cancellation_codes, put_action
+from common.users import USERS_TABLE, claim_email_action, normalize_email
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "my_secret_key")
 
@@ -22,11 +26,11 @@ def build_response(status_code, body_dict):
         "body": json.dumps(body_dict)
     }
 dynamodb = boto3.resource("dynamodb")
-TABLE_NAME = "users"
+TABLE_NAME = USERS_TABLE
 
 def lambda_handler(event, context):
     try:
-        user_id = uuid.uuid4()
+        user_id = str(uuid.uuid4())
         body = event.get("body")
         if body is None:
             return build_response(400, {
@@ -53,21 +57,41 @@ def lambda_handler(event, context):
         data["image"] = None
         data["theme_preference"] = None
         items = {
-            "user_id": user_id, 
-            "email": data["email"],
+            "user_id": user_id,
+            "email": normalize_email(data["email"]),
             "first_name": data["first_name"],
             "last_name": data["last_name"],
             "image": data["image"],
             "password_hash": hash_password(data["password_hash"]),
             "theme_preference": data["theme_preference"],
         }
+        if not items["email"]:
+            return build_response(400, {
+                "status": "error",
+                "message": "email must not be empty"
+            })
         try:
-            table = dynamodb.Table(TABLE_NAME)
-            table.put_item(Item=items)
+            # The user and its email claim are written together; the claim
+            # fails if the email is taken, so there is no separate check
+            dynamodb.meta.client.transact_write_items(TransactItems=[
+                put_action(TABLE_NAME, items, "attribute_not_exists(user_id)"),
+                claim_email_action(items["email"], user_id)
+            ])
             return build_response(200, {
                 "status": "success",
                 "data": items
             })
+        except ClientError as e:
+            codes = cancellation_codes(e)
+            if codes and codes[1] == "ConditionalCheckFailed":
+                return build_response(409, {
+                    "status": "error",
+                    "message": "Email is already registered."
+                })
+            return build_response(500, {
+                "status": "error",
+                "message": f"error DynamoDB insert failed: {str(e)}"
+            })
         except Exception as e:
             return build_response(500, {
                 "status": "error",
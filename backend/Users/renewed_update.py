@@ -1,10 +1,14 @@
 import boto3
-import base64
-import uuid
 import json
 import hashlib
 import hmac
 import os
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.availability import VIEWERS_FIELD, parse_viewers
+from common.transactions import cancellation_codes, update_action
+from common.users import USERS_TABLE, claim_email_action, normalize_email, release_email_action
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "my_secret_key")
 
@@ -18,22 +22,28 @@ def build_response(status_code, body_dict):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "OPTIONS,POST",
-            "Access-Control-Allow-Headers": "Content-Type,user_id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
         },
         "body": json.dumps(body_dict)
     }
 
-s3 = boto3.client("s3")
 dynamodb = boto3.resource("dynamodb")
 
-BUCKET_NAME = "user-images-loc"
-TABLE_NAME = "users"
+TABLE_NAME = USERS_TABLE
 
 def lambda_handler(event, context):
     try:
         table = dynamodb.Table(TABLE_NAME)
 
         user_id = event.get("headers", {}).get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error",
@@ -46,41 +56,42 @@ def lambda_handler(event, context):
 
         data = json.loads(body) if isinstance(body, str) else body
 
-        image_base64 = data.get("image_base64")
-        image_name = data.get("image_name")
-        image_type = data.get("image_type")
-
-        if image_base64:
-            try:
-               image_bytes = base64.b64decode(image_base64)
-               file_name = f"{uuid.uuid4()}_{image_name}"
-
-               s3.put_object(
-                   Bucket=BUCKET_NAME,
-                   Key=f"characters/{file_name}",
-                   Body=image_bytes,
-                   ContentType=image_type
-               )
-
-               image_url = f"https://{BUCKET_NAME}.s3.ap-southeast-2.amazonaws.com/characters/{file_name}"
-
-               data["image"] = image_url
-
-            except Exception as e:
-                return build_response(500, {
-                    "status": "error",
-                    "message": f"S3 upload failed: {str(e)}"
-                })
+        # Avatars go straight to S3 (avatarUploadUrl / avatarUploadComplete),
+        # which is the only writer of image; neither bytes nor URLs are
+        # accepted here
+        if data.get("image_base64"):
+            return build_response(400, {
+                "status": "error",
+                "message": "image_base64 is no longer supported; upload avatars with avatarUploadUrl."
+            })
 
         updatable_fields = [
             "email",
             "first_name",
             "last_name",
-            "image",
             "password_hash",
-            "theme_preference"
+            "theme_preference",
+            VIEWERS_FIELD
         ]
 
+        # Who may combine this user's busy times in getGroupAvailability
+        if VIEWERS_FIELD in data:
+            try:
+                data[VIEWERS_FIELD] = parse_viewers(data[VIEWERS_FIELD], user_id)
+            except ValueError as e:
+                return build_response(400, {
+                    "status": "error",
+                    "message": str(e)
+                })
+
+        if "email" in data:
+            data["email"] = normalize_email(data["email"])
+            if not data["email"]:
+                return build_response(400, {
+                    "status": "error",
+                    "message": "email must not be empty"
+                })
+
         update_expression = []
         expression_attribute_values = {}
 
@@ -99,6 +110,60 @@ def lambda_handler(event, context):
 
         update_expr = "SET " + ", ".join(update_expression)
 
+        # A new email moves the user's claim in USER_EMAILS in the same
+        # transaction as the update, so a taken email fails it
+        if "email" in data:
+            current = table.get_item(
+                Key={"user_id": user_id},
+                ProjectionExpression="email"
+            ).get("Item")
+            if not current:
+                return build_response(404, {
+                    "status": "error",
+                    "message": "User not found."
+                })
+
+            old_email = current.get("email")
+            if old_email != data["email"]:
+                actions = [
+                    update_action(
+                        TABLE_NAME,
+                        {"user_id": user_id},
+                        update_expr,
+                        values={**expression_attribute_values, **({":old_email": old_email} if old_email else {})},
+                        condition="email = :old_email" if old_email else "attribute_not_exists(email)"
+                    )
+                ]
+                # Only a change of spelling (an address stored before emails
+                # were normalized) keeps the same claim
+                if normalize_email(old_email) != data["email"]:
+                    actions.append(claim_email_action(data["email"], user_id))
+                    if old_email:
+                        actions.append(release_email_action(normalize_email(old_email), user_id))
+
+                try:
+                    dynamodb.meta.client.transact_write_items(TransactItems=actions)
+                except ClientError as e:
+                    codes = cancellation_codes(e)
+                    if not codes:
+                        raise
+                    if len(codes) > 1 and codes[1] == "ConditionalCheckFailed":
+                        return build_response(409, {
+                            "status": "error",
+                            "message": "Email is already registered."
+                        })
+                    return build_response(409, {
+                        "status": "error",
+                        "message": "User was changed by another request, please retry."
+                    })
+
+                updated_item = table.get_item(Key={"user_id": user_id}).get("Item", {})
+                return build_response(200, {
+                    "status": "success",
+                    "message": "User updated successfully",
+                    "updated": updated_item
+                })
+
         response = table.update_item(
             Key={"user_id": user_id},
             UpdateExpression=update_expr,
@@ -1,6 +1,8 @@
 import json
 import boto3
 
+from common.serialization import json_default
+
 def lambda_handler(event, context):
     headers = {
         "Access-Control-Allow-Origin": "*",
@@ -46,7 +48,7 @@ def lambda_handler(event, context):
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(unique_by_composite)
+            'body': json.dumps(unique_by_composite, default=json_default)
         }
 
     except Exception as e:
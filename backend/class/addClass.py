@@ -1,8 +1,20 @@
 import json
 import boto3
 from botocore.exceptions import ClientError
-from boto3.dynamodb.conditions import Key, Attr
-from datetime import datetime
+
+from common.auth import AuthError, authenticate
+from common.schedule import schedule_fields
+from common.serialization import json_default
+from common.timeline import load_timeline
+from common.timetable import (
+    MAX_ATTEMPTS,
+    TIMETABLE_TABLE,
+    load_schedule,
+    patch_timetable,
+    timetable_classes,
+    timetable_put_action,
+)
+from common.transactions import cancellation_codes, put_action
 
 def build_response(status_code, body_dict):
     return {
@@ -11,15 +23,18 @@ def build_response(status_code, body_dict):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
-            "Access-Control-Allow-Headers": "Content-Type,user_id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
         },
-        "body": json.dumps(body_dict)
+        "body": json.dumps(body_dict, default=json_default)
     }
 
     
 
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("CLASSES")
+exams_table = dynamodb.Table("Exams")
+submissions_table = dynamodb.Table("Submissions")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
 
 def lambda_handler(event, context):
     try:
@@ -28,9 +43,14 @@ def lambda_handler(event, context):
         
         user_id = event_headers.get("user_id")
         
-        print(f"Received headers: {event_headers}")
-        print(f"Extracted user_id: '{user_id}'")
-        
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error", 
@@ -77,24 +97,12 @@ def lambda_handler(event, context):
                 "message": "Time Start and Time End are required"
             })
 
-        # Check if class already exists
-        existing_class = table.query(
-            KeyConditionExpression=Key("user_id").eq(user_id) & Key("class_code").eq(class_code)
-        )
-
-        if existing_class["Items"]:
-            return build_response(400, {
-                "status": "error",
-                "message": "Class with this code already exists"
-            })
-
-        # Check schedule conflict
-        conflict = check_schedule_conflict(table, user_id, days_of_week, time_start, time_end, class_code)
-        if conflict:
+        try:
+            schedule = schedule_fields(days_of_week, time_start, time_end)
+        except ValueError as e:
             return build_response(400, {
                 "status": "error",
-                "message": "Schedule conflict with existing class",
-                "conflict_with": conflict
+                "message": str(e)
             })
 
         # Create class item
@@ -106,18 +114,65 @@ def lambda_handler(event, context):
             "time_end": time_end,
             "days_of_week": days_of_week,
             "professor": professor,
-            "location": location
+            "location": location,
+            **schedule,
+            "version": 1
         }
 
-        table.put_item(Item=class_item)
+        # One schedule read, one transactional write conditioned on the
+        # schedule version (see updateClass)
+        for _ in range(MAX_ATTEMPTS):
+            timetable, version = load_schedule(table, timetable_table, user_id)
+            timeline = load_timeline(table, exams_table, submissions_table, user_id,
+                                     classes=list(timetable_classes(timetable).values()))
+
+            # Check if class already exists
+            if class_code in timeline.class_codes:
+                return build_response(400, {
+                    "status": "error",
+                    "message": "Class with this code already exists"
+                })
+
+            # Check schedule conflict
+            conflicts, calendar_conflicts = timeline.class_conflicts(schedule, class_code)
+            if conflicts:
+                return build_response(400, {
+                    "status": "error",
+                    "message": "Schedule conflict with existing class",
+                    "conflict_with": conflicts[0],
+                    "conflicts": conflicts
+                })
+
+            try:
+                dynamodb.meta.client.transact_write_items(TransactItems=[
+                    put_action(table.name, class_item, "attribute_not_exists(class_code)"),
+                    timetable_put_action(patch_timetable(timetable, added_items=[class_item]), version)
+                ])
+            except ClientError as e:
+                codes = cancellation_codes(e)
+                if not codes:
+                    raise
+                if codes[0] == "ConditionalCheckFailed":
+                    return build_response(400, {
+                        "status": "error",
+                        "message": "Class with this code already exists"
+                    })
+                # Schedule changed since it was read: try again
+                continue
+
+            return build_response(200, {
+                "status": "success",
+                "message": "Class created successfully",
+                "class": {
+                    "class_code": class_code,
+                    "class_name": class_name
+                },
+                "calendar_conflicts": calendar_conflicts
+            })
 
-        return build_response(200, {
-            "status": "success",
-            "message": "Class created successfully",
-            "class": {
-                "class_code": class_code,
-                "class_name": class_name
-            }
+        return build_response(409, {
+            "status": "error",
+            "message": "Schedule was changed by another request, please retry."
         })
 
     except ClientError as e:
@@ -130,66 +185,3 @@ def lambda_handler(event, context):
             "status": "error", 
             "message": str(e)
         })
-
-
-def parse_time(tstr: str):
-    tstr = tstr.strip()
-    time_formats = ["%H:%M:%S", "%H:%M", "%I:%M %p", "%I:%M:%S %p"]
-    
-    for fmt in time_formats:
-        try:
-            dt = datetime.strptime(tstr, fmt)
-            return dt.time()
-        except ValueError:
-            continue
-    
-    raise ValueError(f"Unable to parse time: {tstr}")
-
-
-def is_time_overlapping(start1, end1, start2, end2):
-    return not (end1 <= start2 or end2 <= start1)
-
-
-def check_schedule_conflict(table, user_id, new_days, new_start_str, new_end_str, exclude_class_code=None):
-    try:
-        new_start = parse_time(new_start_str)
-        new_end = parse_time(new_end_str)
-    except ValueError as e:
-        raise Exception(f"Invalid time format: {str(e)}")
-
-    if new_start >= new_end:
-        raise Exception("timeStart must be earlier than timeEnd")
-
-    response = table.scan(
-        FilterExpression=Attr('user_id').eq(user_id)
-    )
-    existing_classes = response.get('Items', [])
-
-    for cls in existing_classes:
-        if cls.get('class_code') == exclude_class_code:
-            continue
-
-        cls_days = cls.get('days_of_week', [])
-        cls_start_str = cls.get('time_start')
-        cls_end_str = cls.get('time_end')
-
-        shared_days = [day for day in new_days if day in cls_days]
-        if not shared_days:
-            continue
-
-        try:
-            cls_start = parse_time(cls_start_str)
-            cls_end = parse_time(cls_end_str)
-        except ValueError:
-            continue
-
-        if is_time_overlapping(new_start, new_end, cls_start, cls_end):
-            return {
-                "class_name": cls.get('class_name'),
-                "class_code": cls.get('class_code'),
-                "time_start": cls_start_str,
-                "time_end": cls_end_str,
-                "days_of_week": cls_days
-            }
-
-    return None
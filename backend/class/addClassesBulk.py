@@ -0,0 +1,231 @@
+import json
+import boto3
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.schedule import ScheduleIndex, conflict_summary, schedule_fields
+from common.serialization import json_default
+from common.timetable import (
+    MAX_ATTEMPTS,
+    TIMETABLE_TABLE,
+    load_schedule,
+    patch_timetable,
+    timetable_classes,
+    timetable_put_action,
+)
+from common.transactions import cancellation_codes, put_action
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "OPTIONS,POST",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
+        },
+        "body": json.dumps(body_dict, default=json_default)
+    }
+
+
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table("CLASSES")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
+
+MAX_CLASSES_PER_REQUEST = 50
+
+# Class puts per transaction; the patched timetable is one more action
+CLASSES_PER_TRANSACTION = 24
+
+
+def build_class_item(user_id, data):
+    # Same fields and checks as addClass; returns (item, error_message)
+    if not isinstance(data, dict):
+        return None, "Class must be an object"
+
+    class_code = data.get("classCode")
+    class_name = data.get("className")
+    time_start = data.get("timeStart")
+    time_end = data.get("timeEnd")
+    days_of_week = data.get("daysOfWeek")
+
+    if not class_code:
+        return None, "Class Code is required"
+    if not class_name:
+        return None, "Class Name is required"
+    if not days_of_week:
+        return None, "Days of Week are required"
+    if not time_start or not time_end:
+        return None, "Time Start and Time End are required"
+
+    try:
+        schedule = schedule_fields(days_of_week, time_start, time_end)
+    except ValueError as e:
+        return None, str(e)
+
+    return {
+        "user_id": user_id,
+        "class_code": class_code,
+        "class_name": class_name,
+        "time_start": time_start,
+        "time_end": time_end,
+        "days_of_week": days_of_week,
+        "professor": data.get("professor", ""),
+        "location": data.get("location", ""),
+        **schedule,
+        "version": 1
+    }, None
+
+
+def lambda_handler(event, context):
+    try:
+        event_headers = {k.lower(): v.strip() if isinstance(v, str) else v
+                        for k, v in (event.get("headers") or {}).items()}
+
+        user_id = event_headers.get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user_id header is required"
+            })
+
+        body = event.get("body")
+        if not body:
+            return build_response(400, {
+                "status": "error",
+                "message": "Request body is missing"
+            })
+
+        data = json.loads(body) if isinstance(body, str) else body
+        classes = data.get("classes") if isinstance(data, dict) else data
+
+        if not isinstance(classes, list) or not classes:
+            return build_response(400, {
+                "status": "error",
+                "message": "classes must be a non-empty array"
+            })
+        if len(classes) > MAX_CLASSES_PER_REQUEST:
+            return build_response(400, {
+                "status": "error",
+                "message": f"At most {MAX_CLASSES_PER_REQUEST} classes can be added per request"
+            })
+
+        results = {}
+        pending = []
+        for position, entry in enumerate(classes):
+            class_item, error = build_class_item(user_id, entry)
+            if error:
+                class_code = entry.get("classCode") if isinstance(entry, dict) else None
+                results[position] = {"index": position, "class_code": class_code, "status": "error", "message": error}
+            else:
+                pending.append((position, class_item))
+
+        # Like addClass: check against the schedule as read, then commit the
+        # classes with the patched timetable, conditioned on its version, so a
+        # concurrent class write can't slip in between. A lost race re-reads
+        # and re-checks whatever wasn't committed yet.
+        for _ in range(MAX_ATTEMPTS):
+            if not pending:
+                break
+            timetable, version = load_schedule(table, timetable_table, user_id)
+            existing_classes = timetable_classes(timetable)
+            taken_codes = set(existing_classes)
+            index = ScheduleIndex.from_items(existing_classes.values())
+
+            # Accepted classes join the index, so later entries in the same
+            # batch are checked against them too.
+            accepted = []
+            for position, class_item in pending:
+                class_code = class_item["class_code"]
+                if class_code in taken_codes:
+                    results[position] = {
+                        "index": position,
+                        "class_code": class_code,
+                        "status": "error",
+                        "message": "Class with this code already exists"
+                    }
+                    continue
+
+                conflicts = index.conflicts(class_item["day_mask"], class_item["start_min"], class_item["end_min"])
+                if conflicts:
+                    results[position] = {
+                        "index": position,
+                        "class_code": class_code,
+                        "status": "error",
+                        "message": "Schedule conflict with existing class",
+                        "conflicts": [conflict_summary(cls, days) for cls, days in conflicts]
+                    }
+                    continue
+
+                index.add_item(class_item)
+                taken_codes.add(class_code)
+                accepted.append((position, class_item))
+
+            pending = []
+            for start in range(0, len(accepted), CLASSES_PER_TRANSACTION):
+                chunk = accepted[start:start + CLASSES_PER_TRANSACTION]
+                patched = patch_timetable(timetable, added_items=[item for _, item in chunk])
+                try:
+                    dynamodb.meta.client.transact_write_items(TransactItems=[
+                        *[put_action(table.name, item, "attribute_not_exists(class_code)") for _, item in chunk],
+                        timetable_put_action(patched, version)
+                    ])
+                except ClientError as e:
+                    codes = cancellation_codes(e)
+                    if not codes:
+                        raise
+                    # Codes stored with times the timetable couldn't place
+                    # only show up here; the rest go round again
+                    for (position, item), code in zip(chunk, codes):
+                        if code == "ConditionalCheckFailed":
+                            results[position] = {
+                                "index": position,
+                                "class_code": item["class_code"],
+                                "status": "error",
+                                "message": "Class with this code already exists"
+                            }
+                        else:
+                            pending.append((position, item))
+                    pending.extend(accepted[start + CLASSES_PER_TRANSACTION:])
+                    break
+
+                for position, item in chunk:
+                    results[position] = {"index": position, "class_code": item["class_code"], "status": "created"}
+                timetable, version = patched, patched["version"]
+
+        for position, class_item in pending:
+            results[position] = {
+                "index": position,
+                "class_code": class_item["class_code"],
+                "status": "error",
+                "message": "Schedule was changed by another request, please retry."
+            }
+
+        results = [results[position] for position in sorted(results)]
+        created = sum(1 for result in results if result["status"] == "created")
+        return build_response(200, {
+            "status": "success",
+            "message": f"{created} of {len(classes)} classes created",
+            "created": created,
+            "failed": len(classes) - created,
+            "results": results
+        })
+
+    except ClientError as e:
+        return build_response(500, {
+            "status": "error",
+            "message": f"Database error: {str(e)}"
+        })
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -0,0 +1,72 @@
+import json
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from common.pagination import decode_cursor, encode_cursor
+from common.schedule import schedule_fields
+
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table("CLASSES")
+
+# Stop early enough to report the cursor before Lambda times out
+MIN_REMAINING_MS = 10000
+
+
+def lambda_handler(event, context):
+    # One-off job: adds start_min / end_min / day_mask to classes written
+    # before addClass and updateClass stored them. Re-invoke with the returned
+    # "cursor" until it comes back as null.
+    event = event or {}
+    scan_kwargs = {
+        "FilterExpression": Attr("start_min").not_exists(),
+        "ProjectionExpression": "user_id, class_code, time_start, time_end, days_of_week"
+    }
+
+    try:
+        start_key = decode_cursor(event.get("cursor"))
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    updated = 0
+    skipped = []
+
+    while True:
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = start_key
+        response = table.scan(**scan_kwargs)
+
+        for item in response.get("Items", []):
+            try:
+                fields = schedule_fields(item.get("days_of_week"), item.get("time_start"), item.get("time_end"))
+            except ValueError as e:
+                skipped.append({"user_id": item["user_id"], "class_code": item["class_code"], "reason": str(e)})
+                continue
+
+            try:
+                table.update_item(
+                    Key={"user_id": item["user_id"], "class_code": item["class_code"]},
+                    UpdateExpression="SET start_min = :start_min, end_min = :end_min, day_mask = :day_mask",
+                    ConditionExpression=Attr("user_id").exists(),
+                    ExpressionAttributeValues={f":{k}": v for k, v in fields.items()}
+                )
+                updated += 1
+            except ClientError as e:
+                # Deleted since the scan page was read
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key:
+            break
+        if context and context.get_remaining_time_in_millis() < MIN_REMAINING_MS:
+            break
+
+    result = {
+        "status": "success",
+        "updated": updated,
+        "skipped": skipped,
+        "cursor": encode_cursor(start_key)
+    }
+    print(json.dumps(result))
+    return result
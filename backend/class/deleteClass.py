@@ -1,9 +1,21 @@
 import json
 import boto3
 from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Key
+
+from common.auth import AuthError, authenticate
+from common.batch import batch_delete
+from common.pagination import query_all
+from common.timetable import TIMETABLE_TABLE, sync_timetable
 
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("CLASSES")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
+exams_table = dynamodb.Table("Exams")
+submissions_table = dynamodb.Table("Submissions")
+
+# GSI on Exams and Submissions: partition key user_id, sort key class_id
+CLASS_INDEX = "user_id-class_id-index"
 
 
 def build_response(status_code, body_dict):
@@ -12,7 +24,7 @@ def build_response(status_code, body_dict):
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,user_id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id"
         },
         "body": json.dumps(body_dict)
     }
@@ -24,21 +36,28 @@ def lambda_handler(event, context):
         if event.get("headers"):
             user_id = event["headers"].get("user_id")
 
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error",
                 "message": "user_id header is required"
             })
 
-        class_code = None
         params = event.get("queryStringParameters") or {}
-        class_code = params.get("class_code")
+        body = event.get("body")
+        data = (json.loads(body) if isinstance(body, str) else body) if body else {}
 
-        if not class_code:
-            body = event.get("body")
-            if body:
-                data = json.loads(body) if isinstance(body, str) else body
-                class_code = data.get("class_code")
+        class_code = params.get("class_code") or data.get("class_code")
+
+        # cascade=true also deletes the class's exams and submissions
+        cascade = str(params.get("cascade", data.get("cascade", False))).lower() == "true"
 
         if not class_code:
             return build_response(400, {
@@ -46,41 +65,57 @@ def lambda_handler(event, context):
                 "message": "class_code is required in query parameters or request body."
             })
 
-        try:
-            response = table.get_item(
+        # Dependents go first, so a failed cascade can simply be retried, but
+        # only once the class is known to exist: a wrong class_code must not
+        # take every exam and submission filed under it.
+        deleted_counts = {}
+        if cascade:
+            existing = table.get_item(
                 Key={
                     "class_code": class_code,
                     "user_id": user_id
-                }
-            )
-
-            if "Item" not in response:
+                },
+                ProjectionExpression="class_code",
+                ConsistentRead=True
+            ).get("Item")
+            if not existing:
                 return build_response(404, {
                     "status": "error",
                     "message": "Class not found for this user."
                 })
 
+            deleted_counts["deleted_exams"] = delete_dependents(exams_table, user_id, class_code, ["exam_id"])
+            deleted_counts["deleted_submissions"] = delete_dependents(submissions_table, user_id, class_code, ["task_id", "user_id"])
+
+        # The key includes user_id, so existence is the only condition needed
+        try:
+            table.delete_item(
+                Key={
+                    "class_code": class_code,
+                    "user_id": user_id
+                },
+                ConditionExpression="attribute_exists(class_code)"
+            )
         except ClientError as e:
-            return build_response(500, {
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return build_response(404, {
                 "status": "error",
-                "message": f"Error checking class: {str(e)}"
+                "message": "Class not found for this user."
             })
+        sync_timetable(timetable_table, table, user_id, removed_codes=[class_code])
 
-        table.delete_item(
-            Key={
-                "class_code": class_code,
-                "user_id": user_id
-            }
-        )
-
-        return build_response(200, {
+        result = {
             "status": "success",
             "message": "Class deleted successfully.",
             "deleted_class": {
                 "user_id": user_id,
                 "class_code": class_code
-            }
-        })
+            },
+            **deleted_counts
+        }
+
+        return build_response(200, result)
 
     except ClientError as e:
         if e.response["Error"]["Code"] == "ValidationException":
@@ -98,3 +133,14 @@ def lambda_handler(event, context):
             "status": "error",
             "message": str(e)
         })
+
+
+def delete_dependents(dependent_table, user_id, class_code, key_fields):
+    # Only the keys are read from the index, then removed 25 at a time
+    keys = query_all(
+        dependent_table,
+        IndexName=CLASS_INDEX,
+        KeyConditionExpression=Key("user_id").eq(user_id) & Key("class_id").eq(class_code),
+        ProjectionExpression=", ".join(key_fields)
+    )
+    return batch_delete(dynamodb, dependent_table.name, [{f: k[f] for f in key_fields} for k in keys])
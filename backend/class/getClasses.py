@@ -1,21 +1,28 @@
 import json
 import boto3
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
+from common.auth import AuthError, authenticate
+from common.pagination import parse_limit, query_all, query_page
+from common.serialization import json_default
+from common.versioning import etag, get_header, parse_etag
+
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("CLASSES")
 
-def build_response(status_code, body_dict):
+def build_response(status_code, body_dict, extra_headers=None):
     return {
         "statusCode": status_code,
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,user_id",
-            "Access-Control-Allow-Methods": "OPTIONS,GET"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id,If-None-Match",
+            "Access-Control-Allow-Methods": "OPTIONS,GET",
+            "Access-Control-Expose-Headers": "ETag",
+            **(extra_headers or {})
         },
-        "body": json.dumps(body_dict)
+        "body": json.dumps(body_dict, default=json_default)
     }
 
 def lambda_handler(event, context):
@@ -25,8 +32,9 @@ def lambda_handler(event, context):
             'statusCode': 200,
             'headers': {
                 'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,user_id',
+                'Access-Control-Allow-Headers': 'Content-Type,Authorization,user_id,If-None-Match',
                 'Access-Control-Allow-Methods': 'OPTIONS,GET',
+                'Access-Control-Expose-Headers': 'ETag',
                 'Content-Type': 'application/json'
             },
             'body': ''
@@ -39,15 +47,22 @@ def lambda_handler(event, context):
             user_id = event['headers'].get('user_id')
         
         # Validate user_id
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error",
                 "message": "user_id header is required"
             })
 
-        class_code = None
-        if event.get('queryStringParameters'):
-            class_code = event['queryStringParameters'].get('class_code')
+        params = event.get('queryStringParameters') or {}
+        class_code = params.get('class_code')
 
         if class_code:
             # Get ONE specific class
@@ -60,10 +75,29 @@ def lambda_handler(event, context):
                 )
                 
                 if 'Item' in response:
+                    item = response['Item']
+                    tag = etag(item.get("version"))
+
+                    # The client's cached copy is still current
+                    try:
+                        cached_version = parse_etag(get_header(event.get("headers"), "If-None-Match"))
+                    except ValueError:
+                        cached_version = None
+                    if cached_version is not None and etag(cached_version) == tag:
+                        return {
+                            "statusCode": 304,
+                            "headers": {
+                                "Access-Control-Allow-Origin": "*",
+                                "Access-Control-Expose-Headers": "ETag",
+                                "ETag": tag
+                            },
+                            "body": ""
+                        }
+
                     return build_response(200, {
                         "status": "success",
-                        "data": response['Item']
-                    })
+                        "data": item
+                    }, {"ETag": tag})
                 else:
                     return build_response(404, {
                         "status": "error",
@@ -76,15 +110,32 @@ def lambda_handler(event, context):
                     "message": f"Error fetching class: {str(e)}"
                 })
         else:
-            # Get ALL classes for this user
-            resp = table.scan(
-                FilterExpression=Attr("user_id").eq(user_id)
-            )
-            items = resp.get("Items", [])
+            # No paging requested: keep the plain response, but read every page
+            if "limit" not in params and "cursor" not in params:
+                return build_response(200, {
+                    "status": "success",
+                    "data": query_all(table, KeyConditionExpression=Key("user_id").eq(user_id)),
+                })
+
+            # Get ALL classes for this user, one page at a time
+            try:
+                limit = parse_limit(params.get("limit"))
+                items, next_cursor = query_page(
+                    table,
+                    limit=limit,
+                    cursor=params.get("cursor"),
+                    KeyConditionExpression=Key("user_id").eq(user_id)
+                )
+            except ValueError as e:
+                return build_response(400, {
+                    "status": "error",
+                    "message": str(e)
+                })
 
             return build_response(200, {
                 "status": "success",
                 "data": items,
+                "next_cursor": next_cursor
             })
 
     except ClientError as e:
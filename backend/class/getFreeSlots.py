@@ -0,0 +1,121 @@
+import json
+import boto3
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.schedule import DAY_NAMES, day_index, format_minutes, free_slots, parse_day_bound
+from common.serialization import json_default
+from common.timetable import TIMETABLE_TABLE, rebuild_timetable
+
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table("CLASSES")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id",
+            "Access-Control-Allow-Methods": "OPTIONS,GET"
+        },
+        "body": json.dumps(body_dict, default=json_default)
+    }
+
+
+def lambda_handler(event, context):
+    # Handle OPTIONS pre-flight request
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type,Authorization,user_id',
+                'Access-Control-Allow-Methods': 'OPTIONS,GET',
+                'Content-Type': 'application/json'
+            },
+            'body': ''
+        }
+
+    try:
+        user_id = None
+        if event.get('headers'):
+            user_id = event['headers'].get('user_id')
+
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user_id header is required"
+            })
+
+        params = event.get('queryStringParameters') or {}
+
+        # Optional: min_minutes, day_start / day_end ("08:00", "9:00 PM"),
+        # days ("Mon,Wed")
+        try:
+            min_length = int(params.get("min_minutes") or 1)
+            day_start = parse_day_bound(params.get("day_start"), 0)
+            day_end = parse_day_bound(params.get("day_end"), 24 * 60)
+        except ValueError as e:
+            return build_response(400, {
+                "status": "error",
+                "message": f"Invalid parameter: {str(e)}"
+            })
+
+        if min_length < 1 or day_start >= day_end:
+            return build_response(400, {
+                "status": "error",
+                "message": "min_minutes must be positive and day_start earlier than day_end"
+            })
+
+        days = DAY_NAMES
+        if params.get("days"):
+            indexes = [day_index(d) for d in params["days"].split(",")]
+            if None in indexes:
+                return build_response(400, {
+                    "status": "error",
+                    "message": "days must be a comma separated list like Mon,Wed"
+                })
+            days = [DAY_NAMES[d] for d in sorted(set(indexes))]
+
+        # The stored timetable already holds start/end minutes per weekday
+        timetable = timetable_table.get_item(Key={"user_id": user_id}).get("Item")
+        if not timetable:
+            timetable = rebuild_timetable(table, timetable_table, user_id)
+
+        result = {}
+        for day in days:
+            busy = [(int(e["start_min"]), int(e["end_min"])) for e in timetable["days"].get(day, [])]
+            result[day] = [
+                {
+                    "start": format_minutes(start),
+                    "end": format_minutes(end),
+                    "minutes": end - start
+                }
+                for start, end in free_slots(busy, day_start, day_end, min_length)
+            ]
+
+        return build_response(200, {
+            "status": "success",
+            "data": result
+        })
+
+    except ClientError as e:
+        return build_response(500, {
+            "status": "error",
+            "message": e.response["Error"]["Message"]
+        })
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -0,0 +1,196 @@
+import json
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.availability import (
+    MINUTES_PER_DAY,
+    VIEWERS_FIELD,
+    free_runs,
+    group_busy,
+    shares_with,
+    timetable_bitmap,
+)
+from common.batch import BatchIncomplete, batch_get
+from common.pagination import query_all
+from common.schedule import format_minutes, parse_day_bound
+from common.serialization import json_default
+from common.timetable import TIMETABLE_TABLE, build_timetable
+from common.users import USERS_TABLE
+
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table("CLASSES")
+
+MAX_GROUP_SIZE = 100
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id",
+            "Access-Control-Allow-Methods": "OPTIONS,GET,POST"
+        },
+        "body": json.dumps(body_dict, default=json_default)
+    }
+
+
+def load_group(user_ids, caller_id):
+    # One batch read for the whole group: each member's packed bitmap, and
+    # for everyone but the caller, who they share it with. Returns
+    # (timetables, users) keyed by user_id.
+    timetables = {}
+    users = {}
+    request = {
+        TIMETABLE_TABLE: {
+            "Keys": [{"user_id": uid} for uid in user_ids],
+            "ProjectionExpression": "user_id, busy_bits"
+        }
+    }
+    others = [uid for uid in user_ids if uid != caller_id]
+    if others:
+        request[USERS_TABLE] = {
+            "Keys": [{"user_id": uid} for uid in others],
+            "ProjectionExpression": "user_id, #viewers",
+            "ExpressionAttributeNames": {"#viewers": VIEWERS_FIELD}
+        }
+    responses = batch_get(dynamodb, request)
+    for item in responses.get(TIMETABLE_TABLE, []):
+        timetables[item["user_id"]] = item
+    for item in responses.get(USERS_TABLE, []):
+        users[item["user_id"]] = item
+    return timetables, users
+
+
+def member_timetable(timetables, uid):
+    # Members who have never had a timetable stored get one built in memory
+    # from their classes; this is a read-only endpoint, so it isn't saved
+    if uid not in timetables:
+        classes = query_all(table, KeyConditionExpression=Key("user_id").eq(uid))
+        timetables[uid] = build_timetable(uid, classes)
+    return timetables[uid]
+
+
+def lambda_handler(event, context):
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type,Authorization,user_id',
+                'Access-Control-Allow-Methods': 'OPTIONS,GET,POST',
+                'Content-Type': 'application/json'
+            },
+            'body': ''
+        }
+
+    try:
+        user_id = None
+        if event.get('headers'):
+            user_id = event['headers'].get('user_id')
+
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user_id header is required"
+            })
+
+        # Parameters come from the JSON body (POST) or the query string (GET,
+        # with user_ids as a comma separated list)
+        body = event.get("body")
+        if body:
+            params = json.loads(body) if isinstance(body, str) else body
+            member_ids = params.get("user_ids") or []
+        else:
+            params = event.get('queryStringParameters') or {}
+            member_ids = [u for u in (params.get("user_ids") or "").split(",") if u]
+
+        if not isinstance(member_ids, list):
+            return build_response(400, {
+                "status": "error",
+                "message": "user_ids must be a list"
+            })
+
+        # The caller is always part of the group
+        group = list(dict.fromkeys([user_id] + [str(u).strip() for u in member_ids]))
+        if len(group) > MAX_GROUP_SIZE:
+            return build_response(400, {
+                "status": "error",
+                "message": f"A group can have at most {MAX_GROUP_SIZE} members"
+            })
+
+        try:
+            min_length = int(params.get("min_minutes") or 1)
+            day_start = parse_day_bound(params.get("day_start"), 0)
+            day_end = parse_day_bound(params.get("day_end"), MINUTES_PER_DAY)
+        except ValueError as e:
+            return build_response(400, {
+                "status": "error",
+                "message": f"Invalid parameter: {str(e)}"
+            })
+
+        if min_length < 1 or day_start >= day_end:
+            return build_response(400, {
+                "status": "error",
+                "message": "min_minutes must be positive and day_start earlier than day_end"
+            })
+
+        try:
+            timetables, users = load_group(group, user_id)
+        except BatchIncomplete:
+            # Throttled even after backing off; the whole group is needed
+            return build_response(503, {
+                "status": "error",
+                "message": "Too many requests right now, try again shortly"
+            })
+
+        # Unknown user_ids get the same answer as members who haven't shared,
+        # so the response doesn't reveal which accounts exist
+        hidden = [uid for uid in group if uid != user_id and not shares_with(users.get(uid), user_id)]
+        if hidden:
+            return build_response(403, {
+                "status": "error",
+                "message": "These members have not shared their availability with you",
+                "not_shared": hidden
+            })
+
+        busy = group_busy(timetable_bitmap(member_timetable(timetables, uid)) for uid in group)
+
+        slots = {
+            day: [
+                {
+                    "start": format_minutes(start),
+                    "end": format_minutes(end),
+                    "minutes": end - start
+                }
+                for start, end in runs
+            ]
+            for day, runs in free_runs(busy, day_start, day_end, min_length).items()
+        }
+
+        return build_response(200, {
+            "status": "success",
+            "members": group,
+            "data": slots
+        })
+
+    except ClientError as e:
+        return build_response(500, {
+            "status": "error",
+            "message": e.response["Error"]["Message"]
+        })
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -0,0 +1,130 @@
+import json
+from datetime import date
+from itertools import islice
+import boto3
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.occurrences import expand_occurrences, parse_date
+from common.pagination import decode_cursor, encode_cursor, parse_limit
+from common.serialization import json_default
+from common.timetable import TIMETABLE_TABLE, rebuild_timetable
+
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table("CLASSES")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
+
+MAX_RANGE_DAYS = 366
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id",
+            "Access-Control-Allow-Methods": "OPTIONS,GET"
+        },
+        "body": json.dumps(body_dict, default=json_default)
+    }
+
+def lambda_handler(event, context):
+    # Handle OPTIONS pre-flight request
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type,Authorization,user_id',
+                'Access-Control-Allow-Methods': 'OPTIONS,GET',
+                'Content-Type': 'application/json'
+            },
+            'body': ''
+        }
+
+    try:
+        user_id = None
+        if event.get('headers'):
+            user_id = event['headers'].get('user_id')
+
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user_id header is required"
+            })
+
+        params = event.get('queryStringParameters') or {}
+        if not params.get("from") or not params.get("to"):
+            return build_response(400, {
+                "status": "error",
+                "message": "from and to (YYYY-MM-DD) are required"
+            })
+
+        # Optional: term_start / term_end, holidays ("2026-11-01,2026-12-25"),
+        # limit and cursor
+        try:
+            range_start = parse_date(params["from"])
+            range_end = parse_date(params["to"])
+            term_start = parse_date(params["term_start"]) if params.get("term_start") else None
+            term_end = parse_date(params["term_end"]) if params.get("term_end") else None
+            holidays = [parse_date(d) for d in (params.get("holidays") or "").split(",") if d.strip()]
+            limit = parse_limit(params.get("limit"), default=100, maximum=500)
+            cursor = decode_cursor(params.get("cursor"))
+            resume = None
+            if cursor:
+                resume = (date.fromisoformat(cursor["date"]), int(cursor["start_min"]), cursor["class_code"])
+        except (KeyError, TypeError, ValueError) as e:
+            return build_response(400, {
+                "status": "error",
+                "message": str(e) if isinstance(e, ValueError) else "Invalid cursor"
+            })
+
+        if range_start > range_end or (range_end - range_start).days >= MAX_RANGE_DAYS:
+            return build_response(400, {
+                "status": "error",
+                "message": f"from must not be after to, and the range can span at most {MAX_RANGE_DAYS} days"
+            })
+
+        timetable = timetable_table.get_item(Key={"user_id": user_id}).get("Item")
+        if not timetable:
+            timetable = rebuild_timetable(table, timetable_table, user_id)
+
+        # Take one meeting past the page to know where the next page starts
+        occurrences = list(islice(
+            expand_occurrences(timetable["days"], range_start, range_end, term_start, term_end, holidays, resume),
+            limit + 1
+        ))
+
+        next_cursor = None
+        if len(occurrences) > limit:
+            following = occurrences.pop()
+            next_cursor = encode_cursor({
+                "date": following["date"],
+                "start_min": following["start_min"],
+                "class_code": following["class_code"]
+            })
+
+        return build_response(200, {
+            "status": "success",
+            "data": occurrences,
+            "next_cursor": next_cursor
+        })
+
+    except ClientError as e:
+        return build_response(500, {
+            "status": "error",
+            "message": e.response["Error"]["Message"]
+        })
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -0,0 +1,82 @@
+import json
+import boto3
+from botocore.exceptions import ClientError
+
+from common.auth import AuthError, authenticate
+from common.serialization import json_default
+from common.timetable import TIMETABLE_TABLE, rebuild_timetable
+
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table("CLASSES")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
+
+def build_response(status_code, body_dict):
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id",
+            "Access-Control-Allow-Methods": "OPTIONS,GET"
+        },
+        "body": json.dumps(body_dict, default=json_default)
+    }
+
+def lambda_handler(event, context):
+    # Handle OPTIONS pre-flight request
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type,Authorization,user_id',
+                'Access-Control-Allow-Methods': 'OPTIONS,GET',
+                'Content-Type': 'application/json'
+            },
+            'body': ''
+        }
+
+    try:
+        user_id = None
+        if event.get('headers'):
+            user_id = event['headers'].get('user_id')
+
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
+        if not user_id:
+            return build_response(400, {
+                "status": "error",
+                "message": "user_id header is required"
+            })
+
+        # The week is kept up to date by the class handlers, so this is a
+        # single read. It is only built here for users who have no copy yet.
+        timetable = timetable_table.get_item(Key={"user_id": user_id}).get("Item")
+        if not timetable:
+            timetable = rebuild_timetable(table, timetable_table, user_id)
+
+        return build_response(200, {
+            "status": "success",
+            "data": {
+                "days": timetable["days"],
+                "version": timetable.get("version"),
+                "updated_at": timetable.get("updated_at")
+            }
+        })
+
+    except ClientError as e:
+        return build_response(500, {
+            "status": "error",
+            "message": e.response["Error"]["Message"]
+        })
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -1,22 +1,48 @@
 import json
 import boto3
-from boto3.dynamodb.conditions import Attr
 from botocore.exceptions import ClientError
-from datetime import datetime
+
+from common.auth import AuthError, authenticate
+from common.schedule import schedule_fields
+from common.serialization import json_default
+from common.timeline import load_timeline
+from common.timetable import (
+    MAX_ATTEMPTS,
+    TIMETABLE_TABLE,
+    load_schedule,
+    patch_timetable,
+    timetable_classes,
+    timetable_put_action,
+)
+from common.transactions import cancellation_codes, update_action
+from common.versioning import (
+    VERSION_INCREMENT,
+    VERSION_NAMES,
+    VERSION_VALUES,
+    cancelled_item,
+    etag,
+    if_match,
+    version_condition,
+)
 
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table("CLASSES")
+exams_table = dynamodb.Table("Exams")
+submissions_table = dynamodb.Table("Submissions")
+timetable_table = dynamodb.Table(TIMETABLE_TABLE)
 
 
-def build_response(status_code, body_dict):
+def build_response(status_code, body_dict, extra_headers=None):
     return {
         "statusCode": status_code,
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,user_id"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,user_id,If-Match",
+            "Access-Control-Expose-Headers": "ETag",
+            **(extra_headers or {})
         },
-        "body": json.dumps(body_dict)
+        "body": json.dumps(body_dict, default=json_default)
     }
 
 
@@ -24,6 +50,14 @@ def lambda_handler(event, context):
     try:
         # Extract user_id from headers
         user_id = event.get("headers", {}).get("user_id")
+        try:
+            user_id = authenticate(event, user_id)
+        except AuthError as e:
+            return build_response(401, {
+                "status": "error",
+                "message": str(e)
+            })
+
         if not user_id:
             return build_response(400, {
                 "status": "error",
@@ -48,55 +82,6 @@ def lambda_handler(event, context):
                 "message": "class_code is required in request body."
             })
 
-        # Fetch existing class
-        try:
-            response = table.get_item(
-                Key={
-                    "class_code": class_code,
-                    "user_id": user_id
-                }
-            )
-            existing_class = response.get("Item")
-            if not existing_class:
-                return build_response(404, {
-                    "status": "error",
-                    "message": "Class not found for this user."
-                })
-
-        except ClientError as e:
-            return build_response(500, {
-                "status": "error",
-                "message": f"Error fetching class: {str(e)}"
-            })
-
-        # Determine updated values (or default to existing)
-        time_start = data.get("time_start", existing_class.get("time_start"))
-        time_end = data.get("time_end", existing_class.get("time_end"))
-        days_of_week = data.get("days_of_week", existing_class.get("days_of_week"))
-
-        # Check conflict only if schedule fields changed
-        if "time_start" in data or "time_end" in data or "days_of_week" in data:
-            try:
-                conflict = check_schedule_conflict(
-                    table,
-                    user_id,
-                    days_of_week,
-                    time_start,
-                    time_end,
-                    class_code
-                )
-                if conflict:
-                    return build_response(400, {
-                        "status": "error",
-                        "message": "Schedule conflict with existing class",
-                        "conflict_with": conflict
-                    })
-            except Exception as e:
-                return build_response(500, {
-                    "status": "error",
-                    "message": f"Error checking schedule: {str(e)}"
-                })
-
         updatable_fields = [
             "class_name",
             "time_start",
@@ -105,120 +90,164 @@ def lambda_handler(event, context):
             "location",
             "days_of_week",
         ]
+        changes = {field: data[field] for field in updatable_fields if field in data}
 
-        set_parts = []
-        expr_attr_values = {}
-        expr_attr_names = {}
-
-        for field in updatable_fields:
-            if field in data:
-                name_placeholder = f"#{field}"
-                value_placeholder = f":{field}"
-                set_parts.append(f"{name_placeholder} = {value_placeholder}")
-                expr_attr_values[value_placeholder] = data[field]
-                expr_attr_names[name_placeholder] = field
-
-        if not set_parts:
+        if not changes:
             return build_response(400, {
                 "status": "error",
                 "message": "No updatable fields provided."
             })
 
-        update_expression = "SET " + ", ".join(set_parts)
-
-        # Perform update
-        resp = table.update_item(
-            Key={
-                "class_code": class_code,
-                "user_id": user_id
-            },
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expr_attr_values,
-            ExpressionAttributeNames=expr_attr_names,
-            ReturnValues="ALL_NEW"
-        )
-
-        updated = resp.get("Attributes", {})
-
-        return build_response(200, {
-            "status": "success",
-            "data": updated
-        })
-
-    except Exception as e:
-        return build_response(500, {
-            "status": "error",
-            "message": str(e)
-        })
-
-
-
-
-def parse_time(tstr: str):
-    tstr = tstr.strip()
-    time_formats = ["%H:%M:%S", "%H:%M", "%I:%M %p", "%I:%M:%S %p"]
-
-    for fmt in time_formats:
         try:
-            dt = datetime.strptime(tstr, fmt)
-            return dt.time()
-        except ValueError:
-            continue
-
-    raise ValueError(f"Unable to parse time: {tstr}")
-
+            expected_version = if_match(event.get("headers"))
+        except ValueError as e:
+            return build_response(400, {
+                "status": "error",
+                "message": str(e)
+            })
 
-def is_time_overlapping(start1, end1, start2, end2):
-    return not (end1 <= start2 or end2 <= start1)
+        # Read the schedule once, check it, then commit the class and the
+        # patched timetable together. The transaction only succeeds if the
+        # schedule version is still the one read, so two concurrent edits can't
+        # both pass the conflict check; the loser re-reads and checks again.
+        for _ in range(MAX_ATTEMPTS):
+            timetable, version = load_schedule(table, timetable_table, user_id)
+            classes = timetable_classes(timetable)
+
+            # The timetable is read consistently and committed with every
+            # class write, so its copy of the class and its version are
+            # current. A class missing from it either doesn't exist or has
+            # stored times that never parsed; only then is the item read, so
+            # the timetable gets its real fields and version. The update is
+            # pinned to that version, since a transaction can't return the
+            # new one.
+            pinned_version = None
+            existing_class = classes.get(class_code)
+            if existing_class is None:
+                existing_class = table.get_item(
+                    Key={"class_code": class_code, "user_id": user_id},
+                    ConsistentRead=True
+                ).get("Item")
+                if not existing_class:
+                    return build_response(404, {
+                        "status": "error",
+                        "message": "Class not found for this user."
+                    })
+                pinned_version = existing_class.get("version", 0)
 
+            current_version = existing_class.get("version", 0)
+            if expected_version is not None and current_version != expected_version:
+                return build_response(412, {
+                    "status": "error",
+                    "message": "Class was changed by another request.",
+                    "current_version": current_version
+                }, {"ETag": etag(current_version)})
+
+            updated = {**existing_class, **changes, "version": int(current_version) + 1}
+
+            # Check conflict only if schedule fields changed
+            schedule = None
+            calendar_conflicts = []
+            if "time_start" in data or "time_end" in data or "days_of_week" in data:
+                if class_code not in classes and not all(
+                        field in changes for field in ("time_start", "time_end", "days_of_week")):
+                    return build_response(400, {
+                        "status": "error",
+                        "message": "time_start, time_end and days_of_week are all required "
+                                   "to reschedule a class with no valid schedule."
+                    })
 
-def check_schedule_conflict(table, user_id, new_days, new_start_str, new_end_str, exclude_class_code=None):
-    try:
-        new_start = parse_time(new_start_str)
-        new_end = parse_time(new_end_str)
-    except ValueError as e:
-        raise Exception(f"Invalid time format: {str(e)}")
+                try:
+                    schedule = schedule_fields(updated["days_of_week"], updated["time_start"], updated["time_end"])
+                except ValueError as e:
+                    return build_response(400, {
+                        "status": "error",
+                        "message": str(e)
+                    })
 
-    if new_start >= new_end:
-        raise Exception("time_start must be earlier than time_end")
+                try:
+                    timeline = load_timeline(table, exams_table, submissions_table, user_id,
+                                             classes=list(classes.values()))
+                    conflicts, calendar_conflicts = timeline.class_conflicts(schedule, class_code)
+                except Exception as e:
+                    return build_response(500, {
+                        "status": "error",
+                        "message": f"Error checking schedule: {str(e)}"
+                    })
 
-    try:
-        response = table.scan(
-            FilterExpression=Attr("user_id").eq(user_id)
-        )
-        existing_classes = response.get("Items", [])
-    except ClientError as e:
-        raise Exception(f"Database query error: {str(e)}")
+                if conflicts:
+                    return build_response(400, {
+                        "status": "error",
+                        "message": "Schedule conflict with existing class",
+                        "conflict_with": conflicts[0],
+                        "conflicts": conflicts
+                    })
 
-    for cls in existing_classes:
+                # Keep the normalized schedule fields in step with the display strings
+                updated.update(schedule)
 
-        if cls.get("class_code") == exclude_class_code:
-            continue
+            set_values = {**changes, **(schedule or {})}
+            update_expression = "SET " + ", ".join(
+                [f"#{field} = :{field}" for field in set_values] + [VERSION_INCREMENT])
 
-        cls_days = cls.get("days_of_week", [])
-        cls_start_str = cls.get("time_start")
-        cls_end_str = cls.get("time_end")
+            condition = "attribute_exists(user_id)"
+            condition_values = {}
+            if expected_version is not None or pinned_version is not None:
+                version_check, condition_values = version_condition(
+                    expected_version if expected_version is not None else pinned_version)
+                condition += " AND " + version_check
 
-        shared_days = [day for day in new_days if day in cls_days]
-        if not shared_days:
-            continue
+            try:
+                dynamodb.meta.client.transact_write_items(TransactItems=[
+                    update_action(
+                        table.name,
+                        {"class_code": class_code, "user_id": user_id},
+                        update_expression,
+                        names={**{f"#{field}": field for field in set_values}, **VERSION_NAMES},
+                        values={
+                            **{f":{field}": value for field, value in set_values.items()},
+                            **VERSION_VALUES,
+                            **condition_values
+                        },
+                        condition=condition,
+                        return_old_on_failure=True
+                    ),
+                    timetable_put_action(patch_timetable(timetable, added_items=[updated]), version)
+                ])
+            except ClientError as e:
+                codes = cancellation_codes(e)
+                if not codes:
+                    raise
+                if codes[0] == "ConditionalCheckFailed":
+                    current = cancelled_item(e, 0)
+                    if current is None:
+                        return build_response(404, {
+                            "status": "error",
+                            "message": "Class not found for this user."
+                        })
+                    current_version = current.get("version", 0)
+                    if expected_version is not None and current_version != expected_version:
+                        return build_response(412, {
+                            "status": "error",
+                            "message": "Class was changed by another request.",
+                            "current_version": current_version
+                        }, {"ETag": etag(current_version)})
+                # The class or the schedule changed since it was read: try again
+                continue
+
+            return build_response(200, {
+                "status": "success",
+                "data": updated,
+                "calendar_conflicts": calendar_conflicts
+            }, {"ETag": etag(updated["version"])})
+
+        return build_response(409, {
+            "status": "error",
+            "message": "Schedule was changed by another request, please retry."
+        })
 
-        try:
-            cls_start = parse_time(cls_start_str)
-            cls_end = parse_time(cls_end_str)
-        except ValueError:
-            continue
-
-        if is_time_overlapping(new_start, new_end, cls_start, cls_end):
-            return {
-                "class_name": cls.get("class_name"),
-                "class_code": cls.get("class_code"),
-                "time_start": cls_start_str,
-                "time_end": cls_end_str,
-                "days_of_week": cls_days,
-                "professor": cls.get("professor"),
-                "location": cls.get("location"),
-                "conflicting_days": shared_days
-            }
-
-    return None
+    except Exception as e:
+        return build_response(500, {
+            "status": "error",
+            "message": str(e)
+        })
@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+# Session tokens issued by renewed_login: base64url(payload) "." base64url(mac),
+# where payload is {"sub": user_id, "exp": epoch seconds, "kid": key id} and
+# mac is HMAC-SHA256 over the encoded payload. Verifying one is a MAC and a
+# JSON parse, with no I/O.
+#
+# Keys: TOKEN_KEYS="new:secret2,old:secret1" lists key ids and secrets; the
+# first one signs and all of them verify, so a key is rotated by putting a new
+# one in front and dropping the old one after TOKEN_TTL_SECONDS. Without
+# TOKEN_KEYS, SECRET_KEY is used under the id "default"; with neither set the
+# module refuses to load, so no handler runs with a guessable key. Secrets are
+# run through HMAC with a fixed label first, so the token key is never the
+# same as the password pepper even when both come from SECRET_KEY.
+TOKEN_TTL_SECONDS = int(os.environ.get("TOKEN_TTL_SECONDS", 12 * 60 * 60))
+
+# Requests without a token are refused. REQUIRE_AUTH=false lets them fall
+# back to the (unverified) user_id header, only for clients that don't send
+# tokens yet.
+REQUIRE_AUTH = os.environ.get("REQUIRE_AUTH", "true").lower() != "false"
+
+_LABEL = b"session-token"
+
+
+class AuthError(ValueError):
+    pass
+
+
+def _load_keys():
+    configured = os.environ.get("TOKEN_KEYS")
+    if configured:
+        pairs = [entry.split(":", 1) for entry in configured.split(",") if entry.strip()]
+        if not pairs or any(len(pair) != 2 or not pair[0] or not pair[1] for pair in pairs):
+            raise RuntimeError("TOKEN_KEYS must look like kid:secret,kid:secret")
+    elif os.environ.get("SECRET_KEY"):
+        pairs = [("default", os.environ["SECRET_KEY"])]
+    else:
+        raise RuntimeError("Set TOKEN_KEYS or SECRET_KEY to sign session tokens")
+    return [(kid.strip(), hmac.new(secret.encode(), _LABEL, hashlib.sha256).digest()) for kid, secret in pairs]
+
+
+_KEYS = _load_keys()
+_SIGNING_KID, _SIGNING_KEY = _KEYS[0]
+_VERIFY_KEYS = dict(_KEYS)
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _mac(key, payload):
+    return hmac.new(key, payload.encode(), hashlib.sha256).digest()
+
+
+def issue_token(user_id, ttl=TOKEN_TTL_SECONDS, now=None):
+    # Returns (token, expiry epoch seconds)
+    expires_at = int(now if now is not None else time.time()) + ttl
+    payload = _b64encode(json.dumps(
+        {"sub": user_id, "exp": expires_at, "kid": _SIGNING_KID},
+        separators=(",", ":")
+    ).encode())
+    return f"{payload}.{_b64encode(_mac(_SIGNING_KEY, payload))}", expires_at
+
+
+def verify_token(token, now=None):
+    # Returns the token's user_id, or raises AuthError
+    payload, _, signature = (token or "").partition(".")
+    if not payload or not signature:
+        raise AuthError("Malformed token")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+        given = _b64decode(signature)
+    except (ValueError, UnicodeDecodeError):
+        raise AuthError("Malformed token")
+    if not isinstance(claims, dict):
+        raise AuthError("Malformed token")
+
+    # Checked before the lookup: any JSON value can arrive here unsigned
+    kid = claims.get("kid")
+    key = _VERIFY_KEYS.get(kid) if isinstance(kid, str) else None
+    if key is None or not hmac.compare_digest(_mac(key, payload), given):
+        raise AuthError("Invalid token signature")
+
+    expires_at = claims.get("exp")
+    if not isinstance(expires_at, int) or expires_at <= (now if now is not None else time.time()):
+        raise AuthError("Token expired")
+    if not isinstance(claims.get("sub"), str) or not claims["sub"]:
+        raise AuthError("Malformed token")
+    return claims["sub"]
+
+
+def bearer_token(event):
+    for name, value in (event.get("headers") or {}).items():
+        if name.lower() == "authorization" and isinstance(value, str):
+            scheme, _, token = value.strip().partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token.strip()
+    return None
+
+
+def authenticate(event, claimed_user_id=None):
+    # The caller's user_id. With a Bearer token it comes from the token, and
+    # a user_id sent alongside must agree with it; without one it is the
+    # claimed (header) user_id, only when REQUIRE_AUTH=false.
+    token = bearer_token(event)
+    if token is None:
+        if REQUIRE_AUTH:
+            raise AuthError("Authorization token is required")
+        return claimed_user_id
+
+    user_id = verify_token(token)
+    if claimed_user_id and claimed_user_id != user_id:
+        raise AuthError("user_id does not match the token")
+    return user_id
@@ -0,0 +1,83 @@
+from common.schedule import DAY_NAMES
+
+# A user's week as one bitmap: bit day * 1440 + minute is set when that minute
+# is taken by a class. Python ints do the AND/OR over the whole week in one
+# C-level operation, so combining a group is a handful of big-int ops rather
+# than pairwise interval comparisons.
+MINUTES_PER_DAY = 24 * 60
+WEEK_BITS = MINUTES_PER_DAY * len(DAY_NAMES)
+WEEK_BYTES = WEEK_BITS // 8
+DAY_MASK = (1 << MINUTES_PER_DAY) - 1
+
+
+def busy_bitmap(days):
+    bits = 0
+    for d, day in enumerate(DAY_NAMES):
+        offset = d * MINUTES_PER_DAY
+        for entry in days.get(day, []):
+            start, end = int(entry["start_min"]), int(entry["end_min"])
+            if start < end:
+                bits |= ((1 << (end - start)) - 1) << (offset + start)
+    return bits
+
+
+def pack_bitmap(bits):
+    return bits.to_bytes(WEEK_BYTES, "little")
+
+
+def unpack_bitmap(data):
+    # DynamoDB returns Binary attributes wrapped in boto3's Binary type
+    return int.from_bytes(bytes(getattr(data, "value", data)), "little")
+
+
+def timetable_bitmap(timetable):
+    if timetable.get("busy_bits") is not None:
+        return unpack_bitmap(timetable["busy_bits"])
+    return busy_bitmap(timetable.get("days") or {})
+
+
+def free_runs(busy, day_start=0, day_end=MINUTES_PER_DAY, min_length=1):
+    # Free windows per weekday: each run of clear bits inside the bounds.
+    window = ((1 << (day_end - day_start)) - 1) << day_start
+    result = {}
+    for d, day in enumerate(DAY_NAMES):
+        free = ~(busy >> (d * MINUTES_PER_DAY)) & DAY_MASK & window
+        runs = []
+        while free:
+            start = (free & -free).bit_length() - 1
+            shifted = free >> start
+            length = (shifted ^ (shifted + 1)).bit_length() - 1
+            if length >= min_length:
+                runs.append((start, start + length))
+            free &= ~(((1 << length) - 1) << start)
+        result[day] = runs
+    return result
+
+
+def group_busy(bitmaps):
+    # A minute is free for the group only if it is free for every member
+    busy = 0
+    for bits in bitmaps:
+        busy |= bits
+    return busy
+
+
+# Members' busy times are only combined for callers they have shared them
+# with: each user lists those user_ids in availability_viewers on their users
+# item (set through renewed_update).
+VIEWERS_FIELD = "availability_viewers"
+MAX_VIEWERS = 100
+
+
+def parse_viewers(value, owner_id):
+    # The list to store: unique user_ids other than the owner's own
+    if not isinstance(value, list) or not all(isinstance(v, str) and v.strip() for v in value):
+        raise ValueError(f"{VIEWERS_FIELD} must be a list of user_ids")
+    viewers = [v for v in dict.fromkeys(v.strip() for v in value) if v != owner_id]
+    if len(viewers) > MAX_VIEWERS:
+        raise ValueError(f"{VIEWERS_FIELD} can have at most {MAX_VIEWERS} entries")
+    return viewers
+
+
+def shares_with(user_item, viewer_id):
+    return viewer_id in ((user_item or {}).get(VIEWERS_FIELD) or [])
@@ -0,0 +1,135 @@
+import os
+import uuid
+import boto3
+
+# Avatars are uploaded by the client straight to S3 with a presigned POST;
+# the Lambdas only sign the upload and record the result. S3_ENDPOINT_URL
+# points both at a local S3 stand-in (MinIO, moto server) for testing.
+BUCKET_NAME = os.environ.get("AVATAR_BUCKET", "user-images-loc")
+REGION = os.environ.get("AVATAR_REGION", "ap-southeast-2")
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")
+
+KEY_PREFIX = "characters"
+MAX_AVATAR_BYTES = 5 * 1024 * 1024
+UPLOAD_EXPIRES_SECONDS = 300
+
+# Content type -> file extension
+ALLOWED_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+# Resized copies of each upload, written by Users/processAvatar.py under
+# thumbnails/<user_id>/<upload id>/<size>.<ext>. They live outside
+# KEY_PREFIX so writing them never re-triggers the processor, and the keys
+# follow from the original's, so nothing has to be looked up to find them.
+VARIANT_PREFIX = "thumbnails"
+VARIANT_SIZES = (64, 128, 512)
+
+# Variant format -> (file extension, content type)
+VARIANT_FORMATS = {
+    "webp": ("webp", "image/webp"),
+    "jpeg": ("jpg", "image/jpeg"),
+}
+
+
+def s3_client():
+    return boto3.client("s3", region_name=REGION, endpoint_url=S3_ENDPOINT_URL)
+
+
+def user_prefix(user_id):
+    return f"{KEY_PREFIX}/{user_id}/"
+
+
+def new_avatar_key(user_id, content_type):
+    return f"{user_prefix(user_id)}{uuid.uuid4()}.{ALLOWED_TYPES[content_type]}"
+
+
+def presigned_avatar_post(s3, key, content_type):
+    # S3 itself rejects uploads over MAX_AVATAR_BYTES or with another
+    # content type, so nothing has to be checked on the way in
+    return s3.generate_presigned_post(
+        Bucket=BUCKET_NAME,
+        Key=key,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, MAX_AVATAR_BYTES],
+        ],
+        ExpiresIn=UPLOAD_EXPIRES_SECONDS
+    )
+
+
+def object_url(key):
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{BUCKET_NAME}/{key}"
+    return f"https://{BUCKET_NAME}.s3.{REGION}.amazonaws.com/{key}"
+
+
+def parse_avatar_key(key):
+    # (user_id, upload id) for an original upload key, None for anything else
+    parts = key.split("/")
+    if len(parts) != 3 or parts[0] != KEY_PREFIX or not parts[1]:
+        return None
+    stem, dot, ext = parts[2].rpartition(".")
+    if not dot or not stem or ext not in ALLOWED_TYPES.values():
+        return None
+    return parts[1], stem
+
+
+def variant_key(user_id, upload_id, size, fmt):
+    return f"{VARIANT_PREFIX}/{user_id}/{upload_id}/{size}.{VARIANT_FORMATS[fmt][0]}"
+
+
+def variant_urls(user_id, upload_id, sizes=VARIANT_SIZES):
+    # {"webp": {"64": url, ...}, "jpeg": {...}}; sizes are strings since
+    # DynamoDB map keys are
+    return {
+        fmt: {str(size): object_url(variant_key(user_id, upload_id, size, fmt)) for size in sizes}
+        for fmt in VARIANT_FORMATS
+    }
+
+
+def key_from_url(url):
+    # The object key behind an object_url, or None for any other URL
+    base = object_url("")
+    if not isinstance(url, str) or not url.startswith(base):
+        return None
+    return url[len(base):]
+
+
+def upload_keys(key):
+    # The original upload and every variant key it can have, for deleting it
+    parsed = parse_avatar_key(key)
+    if parsed is None:
+        return []
+    user_id, upload_id = parsed
+    return [key] + [variant_key(user_id, upload_id, size, fmt) for size in VARIANT_SIZES for fmt in VARIANT_FORMATS]
+
+
+def delete_upload(s3, key):
+    # Removes an upload and its variants in one request (missing keys are
+    # fine). Only logs on failure: callers have already done their real work.
+    keys = upload_keys(key)
+    if not keys:
+        return
+    try:
+        response = s3.delete_objects(
+            Bucket=BUCKET_NAME,
+            Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True}
+        )
+        for error in response.get("Errors", []):
+            print(f"Avatar delete failed for {error.get('Key')}: {error.get('Message')}")
+    except Exception as e:
+        print(f"Avatar delete failed for {key}: {str(e)}")
+
+
+def current_variants(item):
+    # The user's image_variants if they were made from the current image.
+    # Processing and avatarUploadComplete race, so either may land first.
+    variants = (item or {}).get("image_variants")
+    if not variants or variants.get("source") != item.get("image"):
+        return None
+    return variants
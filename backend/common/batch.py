@@ -0,0 +1,71 @@
+import random
+import time
+
+# batch_write_item takes at most 25 requests per call
+BATCH_SIZE = 25
+# and batch_get_item at most 100 keys, across all tables
+GET_BATCH_SIZE = 100
+MAX_RETRIES = 6
+BASE_DELAY = 0.05
+
+
+class BatchIncomplete(Exception):
+    # Some keys or writes were still unprocessed after MAX_RETRIES; the table
+    # is throttled, so callers can tell the client to come back later
+    pass
+
+
+def backoff(attempt):
+    # Exponential backoff with full jitter before resend number attempt + 1
+    time.sleep(random.uniform(0, BASE_DELAY * 2 ** attempt))
+
+
+def chunks(items, size=BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def batch_write(dynamodb, table_name, requests):
+    # Sends write requests in chunks of 25 and resends UnprocessedItems with
+    # exponential backoff and jitter, as DynamoDB asks for when throttling.
+    written = 0
+    for chunk in chunks(requests):
+        pending = {table_name: chunk}
+        for attempt in range(MAX_RETRIES + 1):
+            response = dynamodb.batch_write_item(RequestItems=pending)
+            unprocessed = response.get("UnprocessedItems") or {}
+            written += len(pending[table_name]) - len(unprocessed.get(table_name, []))
+            if not unprocessed:
+                break
+            if attempt == MAX_RETRIES:
+                raise BatchIncomplete(f"{len(unprocessed[table_name])} writes to {table_name} were not processed")
+            pending = unprocessed
+            backoff(attempt)
+    return written
+
+
+def batch_get(dynamodb, request_items):
+    # batch_get_item for any number of keys: sent GET_BATCH_SIZE keys at a
+    # time, resending UnprocessedKeys the same way. Returns {table_name: [items]}.
+    keys = [(table_name, key) for table_name, request in request_items.items() for key in request["Keys"]]
+    responses = {}
+    for chunk in chunks(keys, GET_BATCH_SIZE):
+        pending = {}
+        for table_name, key in chunk:
+            pending.setdefault(table_name, {**request_items[table_name], "Keys": []})["Keys"].append(key)
+        for attempt in range(MAX_RETRIES + 1):
+            response = dynamodb.batch_get_item(RequestItems=pending)
+            for table_name, items in response.get("Responses", {}).items():
+                responses.setdefault(table_name, []).extend(items)
+            pending = response.get("UnprocessedKeys")
+            if not pending:
+                break
+            if attempt == MAX_RETRIES:
+                missing = sum(len(request["Keys"]) for request in pending.values())
+                raise BatchIncomplete(f"{missing} keys were not read")
+            backoff(attempt)
+    return responses
+
+
+def batch_delete(dynamodb, table_name, keys):
+    return batch_write(dynamodb, table_name, [{"DeleteRequest": {"Key": key}} for key in keys])
@@ -0,0 +1,112 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Dates and deadlines arrive as ISO strings. Writers store them as sent, plus
+# epoch seconds (UTC) next to them (deadline_epoch, date_epoch), so readers
+# sort, compare and range-query integers instead of parsing strings.
+# A deadline without an offset is read as UTC. Clients send either an offset
+# or the X-Timezone header, which localize_deadline turns into one before the
+# deadline is stored.
+TIMEZONE_HEADER = "X-Timezone"
+EPOCH_FIELDS = ("deadline_epoch", "date_epoch")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def normalize_date(value):
+    # "YYYY-MM-DD" for any ISO date or datetime string, so stored dates sort
+    # and range-query correctly as plain strings.
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid date: {value}")
+    text = value.strip()
+    try:
+        if len(text) > 10:
+            return datetime.fromisoformat(text).date().isoformat()
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+
+def parse_datetime(value):
+    # Naive UTC datetime for an ISO datetime string; offsets are converted,
+    # values without one are taken as UTC
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid datetime: {value}")
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"Invalid datetime: {value}")
+    if dt.tzinfo:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def localize_deadline(value, zone_name):
+    # The deadline to store: a datetime without an offset gets the offset of
+    # zone_name (an IANA name such as "Europe/Berlin") at that time; anything
+    # else, or no zone_name, is returned unchanged. Raises ValueError for an
+    # unknown zone.
+    if not zone_name:
+        return value
+    try:
+        zone = ZoneInfo(zone_name.strip())
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {zone_name}")
+    if not isinstance(value, str) or len(value.strip()) <= 10:
+        return value
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return value
+    if dt.tzinfo:
+        return value
+    return dt.replace(tzinfo=zone).isoformat()
+
+
+def is_time_of_day(value):
+    # "HH:MM" or "HH:MM:SS" with no date, which updateSubmissions still accepts
+    # as a deadline
+    if not isinstance(value, str):
+        return False
+    for fmt in ("%H:%M", "%H:%M:%S"):
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            pass
+    return False
+
+
+def to_epoch(dt):
+    return (dt - _EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(seconds):
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+def deadline_epoch(value):
+    # Epoch seconds for a dated deadline, None for anything else
+    try:
+        return to_epoch(parse_datetime(value))
+    except ValueError:
+        return None
+
+
+def date_epoch(value):
+    # Epoch seconds of midnight UTC on the given date, None if it isn't one
+    try:
+        return to_epoch(datetime.fromisoformat(normalize_date(value)))
+    except ValueError:
+        return None
+
+
+def epoch_fields(deadline, day):
+    fields = {}
+    seconds = deadline_epoch(deadline)
+    if seconds is not None:
+        fields["deadline_epoch"] = seconds
+    seconds = date_epoch(day)
+    if seconds is not None:
+        fields["date_epoch"] = seconds
+    return fields
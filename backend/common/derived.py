@@ -0,0 +1,57 @@
+from botocore.exceptions import ClientError
+
+# Attributes that are computed from other attributes of the same item, so
+# they can be indexed. Each one follows from a single input (plus the key), so
+# an update sets them from the request in the same write. The backfill, and
+# the rare update whose request doesn't settle them, fix them up from the
+# stored item instead.
+
+
+def update_parts(set_fields, remove_fields, names, values):
+    # "#f = :f" SET clauses and "#f" REMOVE clauses for the given fields,
+    # adding their names and values to the update's maps
+    names.update({f"#{f}": f for f in list(set_fields) + list(remove_fields)})
+    values.update({f":{f}": value for f, value in set_fields.items()})
+    return [f"#{f} = :{f}" for f in set_fields], [f"#{f}" for f in remove_fields]
+
+
+def sync_attributes(table, key, item, wanted, fields):
+    # Sets the fields present in wanted and removes the others, in one
+    # update, and returns the item as now stored. No write when they already
+    # match.
+    if all(item.get(f) == wanted.get(f) for f in fields):
+        return item
+
+    parts = []
+    names = {}
+    values = {}
+    set_fields = [f for f in fields if f in wanted]
+    remove_fields = [f for f in fields if f not in wanted and f in item]
+    if set_fields:
+        parts.append("SET " + ", ".join(f"#{f} = :{f}" for f in set_fields))
+        values.update({f":{f}": wanted[f] for f in set_fields})
+    if remove_fields:
+        parts.append("REMOVE " + ", ".join(f"#{f}" for f in remove_fields))
+    names.update({f"#{f}": f for f in set_fields + remove_fields})
+
+    # Never recreate an item deleted since it was read
+    key_field = next(iter(key))
+    names["#key"] = key_field
+    kwargs = {
+        "Key": key,
+        "UpdateExpression": " ".join(parts),
+        "ConditionExpression": "attribute_exists(#key)",
+        "ExpressionAttributeNames": names
+    }
+    if values:
+        kwargs["ExpressionAttributeValues"] = values
+    try:
+        table.update_item(**kwargs)
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return item
+
+    synced = {k: v for k, v in item.items() if k not in remove_fields}
+    synced.update({f: wanted[f] for f in set_fields})
+    return synced
@@ -0,0 +1,53 @@
+from common.dates import EPOCH_FIELDS, date_epoch, deadline_epoch, epoch_fields
+from common.derived import sync_attributes
+from common.reminders import DUE_FIELDS, deadline_due_fields, due_fields
+
+# Computed attributes stored on every exam: the reminder bucket and the epoch
+# copies of deadline and exam_date
+DERIVED_FIELDS = DUE_FIELDS + EPOCH_FIELDS
+# The attributes they are computed from
+DERIVED_FROM = ("status", "deadline", "exam_date")
+
+
+def derived_fields(item):
+    return {
+        **due_fields("exam", item),
+        **epoch_fields(item.get("deadline"), item.get("exam_date"))
+    }
+
+
+def update_fields(changes):
+    # (set, remove) for the computed fields that follow from an update's
+    # changes, or None when reopening an exam without a deadline, which needs
+    # the stored one. Every exam has an exam_date (addExam requires it), so
+    # the deadline alone decides the reminder fields.
+    set_fields = {}
+    remove_fields = []
+
+    status = changes.get("status")
+    if "deadline" in changes:
+        seconds = deadline_epoch(changes["deadline"])
+        if seconds is None:
+            remove_fields.append("deadline_epoch")
+        else:
+            set_fields["deadline_epoch"] = seconds
+        due = {} if status == "completed" else deadline_due_fields(changes["deadline"])
+        set_fields.update(due)
+        remove_fields.extend(f for f in DUE_FIELDS if f not in due)
+    elif status == "completed":
+        remove_fields.extend(DUE_FIELDS)
+    elif "status" in changes:
+        return None
+
+    if "exam_date" in changes:
+        seconds = date_epoch(changes["exam_date"])
+        if seconds is None:
+            remove_fields.append("date_epoch")
+        else:
+            set_fields["date_epoch"] = seconds
+
+    return set_fields, remove_fields
+
+
+def sync_derived(table, key, item):
+    return sync_attributes(table, key, item, derived_fields(item), DERIVED_FIELDS)
@@ -0,0 +1,46 @@
+from datetime import date, datetime, timedelta
+
+from common.schedule import DAY_NAMES
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid date: {value}")
+
+
+def expand_occurrences(days, range_start, range_end, term_start=None, term_end=None, holidays=(), resume=None):
+    # Lazily yields dated class meetings between range_start and range_end
+    # (inclusive), in time order. `days` is the timetable's day buckets, which
+    # are already sorted by start time, so walking the calendar day by day is
+    # enough; nothing is generated until the caller asks for it.
+    # resume=(date, start_min, class_code) restarts at that meeting.
+    first = max(range_start, term_start) if term_start else range_start
+    last = min(range_end, term_end) if term_end else range_end
+    skipped = set(holidays)
+
+    if resume and resume[0] > first:
+        first = resume[0]
+
+    day = first
+    while day <= last:
+        if day not in skipped:
+            for entry in days.get(DAY_NAMES[day.weekday()], []):
+                start_min, end_min = int(entry["start_min"]), int(entry["end_min"])
+                if resume and day == resume[0] and (start_min, entry["class_code"]) < resume[1:]:
+                    continue
+                midnight = datetime(day.year, day.month, day.day)
+                yield {
+                    "date": day.isoformat(),
+                    "class_code": entry["class_code"],
+                    "class_name": entry.get("class_name"),
+                    "time_start": entry.get("time_start"),
+                    "time_end": entry.get("time_end"),
+                    "start": (midnight + timedelta(minutes=start_min)).isoformat(),
+                    "end": (midnight + timedelta(minutes=end_min)).isoformat(),
+                    "start_min": start_min,
+                    "professor": entry.get("professor", ""),
+                    "location": entry.get("location", "")
+                }
+        day += timedelta(days=1)
@@ -0,0 +1,79 @@
+import base64
+import json
+
+from common.serialization import json_default
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, default=json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a positive integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
+
+
+def query_page(table, limit=None, cursor=None, **kwargs):
+    if limit:
+        kwargs["Limit"] = limit
+    start_key = decode_cursor(cursor)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+
+    response = table.query(**kwargs)
+    return response.get("Items", []), encode_cursor(response.get("LastEvaluatedKey"))
+
+
+def query_all(table, **kwargs):
+    response = table.query(**kwargs)
+    items = response.get("Items", [])
+
+    while "LastEvaluatedKey" in response:
+        response = table.query(ExclusiveStartKey=response["LastEvaluatedKey"], **kwargs)
+        items.extend(response.get("Items", []))
+
+    return items
+
+
+def projection(fields_param, allowed, required=()):
+    # Turns "fields=a,b" into ProjectionExpression kwargs. Every name goes
+    # through a placeholder, so reserved words like "status" are fine.
+    if not fields_param:
+        return {}
+
+    fields = [f.strip() for f in fields_param.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    fields = list(dict.fromkeys(list(required) + fields))
+    return {
+        "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(fields))),
+        "ExpressionAttributeNames": {f"#p{i}": f for i, f in enumerate(fields)}
+    }
@@ -0,0 +1,104 @@
+import heapq
+import json
+from datetime import timedelta
+from boto3.dynamodb.conditions import Key
+
+from common.pagination import query_all
+from common.timeline import exam_event, parse_datetime, submission_event
+
+# Exams and submissions that are still open carry due_bucket (the due hour,
+# "YYYY-MM-DDTHH") and due_at (ISO). Both tables have a sparse GSI on them, so
+# the reminder job reads one hour of due items with a single query instead of
+# scanning. Deadlines with no date have neither field and are not in the
+# index. Completing an item removes them; a deadline edit sets them without
+# knowing the stored status, so the job also skips completed items it finds.
+REMINDER_INDEX = "due_bucket-due_at-index"
+BUCKET_FORMAT = "%Y-%m-%dT%H"
+DUE_FIELDS = ("due_bucket", "due_at")
+
+EVENT_BUILDERS = {
+    "exam": exam_event,
+    "submission": submission_event,
+}
+
+
+def due_bucket(dt):
+    return dt.strftime(BUCKET_FORMAT)
+
+
+def deadline_due_fields(deadline):
+    # {"due_bucket", "due_at"} for a dated deadline, else {}
+    start = parse_datetime(deadline)
+    if start is None:
+        return {}
+    return {
+        "due_bucket": due_bucket(start),
+        "due_at": start.isoformat()
+    }
+
+
+def due_fields(kind, item):
+    # The same for a whole item: {} once it is completed, and for exams
+    # without an exam_date (which have no calendar slot)
+    if item.get("status") == "completed":
+        return {}
+    if kind == "exam" and not item.get("exam_date"):
+        return {}
+    return deadline_due_fields(item.get("deadline"))
+
+
+def bucket_for(now, lead_hours):
+    # The hour whose items are reminded about now
+    hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=lead_hours)
+    return due_bucket(hour)
+
+
+def query_due(table, bucket):
+    return query_all(
+        table,
+        IndexName=REMINDER_INDEX,
+        KeyConditionExpression=Key("due_bucket").eq(bucket)
+    )
+
+
+class ReminderQueue:
+    # Min-heap of (due time, sequence, reminder) for the window being sent, so
+    # exams and submissions from separate queries come out in due order
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, due, reminder):
+        heapq.heappush(self._heap, (due, self._seq, reminder))
+        self._seq += 1
+
+    def pop_batch(self, size):
+        batch = []
+        while self._heap and len(batch) < size:
+            batch.append(heapq.heappop(self._heap)[2])
+        return batch
+
+
+def reminder(kind, item, event):
+    return {
+        "type": kind,
+        "id": event["id"],
+        "user_id": item.get("user_id"),
+        "title": event["title"],
+        "class_id": event["class_id"],
+        "due_at": event["start"].isoformat()
+    }
+
+
+class LogSink:
+    # Stand-in for the notification service: writes each batch to the
+    # function's log. A real sink only needs the same send(batch) method.
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, batch):
+        print(json.dumps({"reminders": batch}))
+        self.sent += len(batch)
@@ -0,0 +1,207 @@
+from bisect import bisect_left, bisect_right
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+DAY_INDEX = {}
+for _i, _name in enumerate(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]):
+    DAY_INDEX[_name.lower()] = _i
+    DAY_INDEX[_name[:3].lower()] = _i
+
+
+def day_index(day):
+    if not isinstance(day, str):
+        return None
+    return DAY_INDEX.get(day.strip().lower())
+
+
+def parse_minutes(tstr):
+    # Accepts "HH:MM", "HH:MM:SS", "H:MM AM" and "H:MM:SS PM" and returns
+    # minutes since midnight. Plain string ops only: this runs for every class
+    # on every conflict check, so it avoids strptime.
+    if not isinstance(tstr, str):
+        raise ValueError(f"Unable to parse time: {tstr}")
+
+    text = tstr.strip().upper()
+    meridiem = None
+    if text.endswith("AM") or text.endswith("PM"):
+        meridiem = text[-2:]
+        text = text[:-2].rstrip()
+
+    parts = text.split(":")
+    if len(parts) not in (2, 3) or not all(len(p) in (1, 2) and p.isdigit() for p in parts):
+        raise ValueError(f"Unable to parse time: {tstr}")
+
+    hour, minute = int(parts[0]), int(parts[1])
+    second = int(parts[2]) if len(parts) == 3 else 0
+    if minute > 59 or second > 59:
+        raise ValueError(f"Unable to parse time: {tstr}")
+
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Unable to parse time: {tstr}")
+        hour = hour % 12 + (12 if meridiem == "PM" else 0)
+    elif hour > 23:
+        raise ValueError(f"Unable to parse time: {tstr}")
+
+    return hour * 60 + minute
+
+
+def parse_day_bound(value, default):
+    # Like parse_minutes, but also accepts "24:00" as the end of the day
+    if value in (None, ""):
+        return default
+    if str(value).strip() in ("24:00", "24:00:00"):
+        return 24 * 60
+    return parse_minutes(value)
+
+
+def day_mask(days):
+    mask = 0
+    for day in days or []:
+        d = day_index(day)
+        if d is not None:
+            mask |= 1 << d
+    return mask
+
+
+def mask_days(mask):
+    return [d for d in range(len(DAY_NAMES)) if mask >> d & 1]
+
+
+def schedule_fields(days, time_start, time_end):
+    # Normalized copies of the display fields, stored on every class item so
+    # readers never have to parse time strings again.
+    try:
+        start_min = parse_minutes(time_start)
+        end_min = parse_minutes(time_end)
+    except ValueError as e:
+        raise ValueError(f"Invalid time format: {str(e)}")
+
+    if start_min >= end_min:
+        raise ValueError("time_start must be earlier than time_end")
+
+    return {
+        "start_min": start_min,
+        "end_min": end_min,
+        "day_mask": day_mask(days)
+    }
+
+
+def item_schedule(item):
+    # Prefers the stored normalized fields and only parses items written
+    # before they existed. Returns None for items with unusable times.
+    if "start_min" in item and "end_min" in item and "day_mask" in item:
+        return int(item["start_min"]), int(item["end_min"]), int(item["day_mask"])
+
+    try:
+        start_min = parse_minutes(item.get("time_start"))
+        end_min = parse_minutes(item.get("time_end"))
+    except ValueError:
+        return None
+    return start_min, end_min, day_mask(item.get("days_of_week"))
+
+
+def is_time_overlapping(start1, end1, start2, end2):
+    return not (end1 <= start2 or end2 <= start1)
+
+
+class DaySlots:
+    # Intervals for one weekday, kept sorted by start minute. max_ends[i] is the
+    # largest end among the first i + 1 intervals, so it never decreases and can
+    # be bisected to find the first interval that could still reach a given time.
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.max_ends = []
+        self.entries = []
+
+    def insert(self, start, end, entry):
+        pos = bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.ends.insert(pos, end)
+        self.entries.insert(pos, entry)
+        self.max_ends.insert(pos, end)
+
+        running = self.max_ends[pos - 1] if pos else end
+        for i in range(pos, len(self.max_ends)):
+            running = max(running, self.ends[i])
+            self.max_ends[i] = running
+
+    def overlapping(self, start, end):
+        hi = bisect_left(self.starts, end)
+        lo = bisect_right(self.max_ends, start, 0, hi)
+        return [self.entries[i] for i in range(lo, hi) if self.ends[i] > start]
+
+
+class ScheduleIndex:
+
+    def __init__(self):
+        self.days = [DaySlots() for _ in DAY_NAMES]
+
+    @classmethod
+    def from_items(cls, items, exclude_class_code=None):
+        index = cls()
+        for item in items:
+            if item.get("class_code") == exclude_class_code:
+                continue
+            index.add_item(item)
+        return index
+
+    def add_item(self, item):
+        schedule = item_schedule(item)
+        if schedule is None:
+            return False
+
+        start, end, mask = schedule
+        self.add(item, mask, start, end)
+        return True
+
+    def add(self, entry, mask, start, end):
+        for d in mask_days(mask):
+            self.days[d].insert(start, end, entry)
+
+    def conflicts(self, mask, start, end):
+        # Returns every indexed entry that overlaps [start, end) on any day in
+        # the mask, once per entry, together with the days it collides on.
+        found = {}
+        for d in mask_days(mask):
+            for entry in self.days[d].overlapping(start, end):
+                hit = found.setdefault(id(entry), (entry, []))
+                hit[1].append(DAY_NAMES[d])
+        return list(found.values())
+
+
+def conflict_summary(cls, conflicting_days):
+    return {
+        "class_name": cls.get("class_name"),
+        "class_code": cls.get("class_code"),
+        "time_start": cls.get("time_start"),
+        "time_end": cls.get("time_end"),
+        "days_of_week": cls.get("days_of_week", []),
+        "professor": cls.get("professor"),
+        "location": cls.get("location"),
+        "conflicting_days": conflicting_days
+    }
+
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def free_slots(intervals, day_start=0, day_end=24 * 60, min_length=1):
+    # Sweep over the busy intervals in start order, tracking how far the busy
+    # time reaches; every gap of at least min_length between day_start and
+    # day_end is free.
+    slots = []
+    cursor = day_start
+    for start, end in sorted(intervals):
+        if start >= day_end:
+            break
+        if start - cursor >= min_length:
+            slots.append((cursor, start))
+        cursor = max(cursor, end)
+    if day_end - cursor >= min_length:
+        slots.append((cursor, day_end))
+    return slots
@@ -0,0 +1,10 @@
+from decimal import Decimal
+
+
+def json_default(value):
+    # DynamoDB hands numbers back as Decimal, which json.dumps can't encode.
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, set):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,103 @@
+from boto3.dynamodb.conditions import Key
+
+from common.dates import EPOCH_FIELDS, date_epoch, deadline_epoch, epoch_fields
+from common.derived import sync_attributes
+from common.reminders import DUE_FIELDS, deadline_due_fields, due_fields
+
+# Submissions carry user_status ("<user_id>#pending") and deadline_sort (the
+# deadline in epoch seconds) for the user_status-deadline_sort-index GSI, so
+# one status is read in deadline order without touching the rest. Each
+# depends on one attribute only, so a status change (completing, the overdue
+# sweep) rewrites the key without knowing the deadline. Deadlines with no date
+# sort after every dated one.
+STATUS_INDEX = "user_status-deadline_sort-index"
+STATUS_FIELDS = ("user_status", "deadline_sort")
+UNDATED_SORT = 10 ** 12
+DERIVED_FIELDS = DUE_FIELDS + STATUS_FIELDS + EPOCH_FIELDS
+# The attributes they are computed from
+DERIVED_FROM = ("status", "deadline", "submission_date")
+
+_DAY_SECONDS = 24 * 60 * 60
+
+
+def user_status(user_id, status):
+    return f"{user_id}#{status or 'pending'}"
+
+
+def deadline_sort(deadline):
+    seconds = deadline_epoch(deadline)
+    return UNDATED_SORT if seconds is None else seconds
+
+
+def derived_fields(item):
+    return {
+        **due_fields("submission", item),
+        "user_status": user_status(item.get("user_id"), item.get("status")),
+        "deadline_sort": deadline_sort(item.get("deadline")),
+        **epoch_fields(item.get("deadline"), item.get("submission_date"))
+    }
+
+
+def update_fields(user_id, changes):
+    # (set, remove) for the computed fields that follow from an update's
+    # changes, or None when they can't be worked out without the stored item:
+    # reopening a submission without a deadline needs its stored deadline for
+    # the reminder fields.
+    set_fields = {}
+    remove_fields = []
+
+    status = changes.get("status")
+    if "status" in changes:
+        set_fields["user_status"] = user_status(user_id, status)
+
+    if "deadline" in changes:
+        set_fields["deadline_sort"] = deadline_sort(changes["deadline"])
+        seconds = deadline_epoch(changes["deadline"])
+        if seconds is None:
+            remove_fields.append("deadline_epoch")
+        else:
+            set_fields["deadline_epoch"] = seconds
+        due = {} if status == "completed" else deadline_due_fields(changes["deadline"])
+        set_fields.update(due)
+        remove_fields.extend(f for f in DUE_FIELDS if f not in due)
+    elif status == "completed":
+        remove_fields.extend(DUE_FIELDS)
+    elif "status" in changes:
+        return None
+
+    if "submission_date" in changes:
+        seconds = date_epoch(changes["submission_date"])
+        if seconds is None:
+            remove_fields.append("date_epoch")
+        else:
+            set_fields["date_epoch"] = seconds
+
+    return set_fields, remove_fields
+
+
+def sync_derived(table, key, item):
+    return sync_attributes(table, key, item, derived_fields(item), DERIVED_FIELDS)
+
+
+def _bound(value, end_of_day):
+    # Epoch seconds for an ISO datetime, or for a date: its first second, or
+    # its last one when it closes the range
+    seconds = deadline_epoch(value)
+    if seconds is not None and len(value.strip()) > 10:
+        return seconds
+    seconds = date_epoch(value)
+    if seconds is None:
+        raise ValueError(f"Invalid deadline bound: {value}")
+    return seconds + _DAY_SECONDS - 1 if end_of_day else seconds
+
+
+def status_key(user_id, status, deadline_from=None, deadline_to=None):
+    # Key condition for one status, optionally limited to dated deadlines in
+    # [deadline_from, deadline_to] (ISO; a date-only deadline_to covers that
+    # whole day). Raises ValueError for a bound that isn't a date.
+    key = Key("user_status").eq(user_status(user_id, status))
+    if not deadline_from and not deadline_to:
+        return key
+    low = _bound(deadline_from, False) if deadline_from else 0
+    high = _bound(deadline_to, True) if deadline_to else UNDATED_SORT - 1
+    return key & Key("deadline_sort").between(low, high)
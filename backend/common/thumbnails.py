@@ -0,0 +1,70 @@
+import io
+
+# Pillow is not part of the Lambda runtime. It ships as its own layer, attached
+# only to Users/processAvatar.py, so everything else imports this module
+# without it and HAS_PILLOW says whether resizing is possible.
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+HAS_PILLOW = Image is not None
+
+# Uploads are capped at 5 MB, but a small compressed file can still decode
+# to a huge bitmap; refuse anything above this many pixels before decoding.
+MAX_SOURCE_PIXELS = 40_000_000
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+
+def _open(data):
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    if width * height > MAX_SOURCE_PIXELS:
+        raise ValueError(f"Image is too large: {width}x{height}")
+    # Animated GIFs keep their first frame; phone photos are turned upright
+    image.seek(0)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+    return image
+
+
+def _encode(image, fmt):
+    out = io.BytesIO()
+    if fmt == "jpeg":
+        if image.mode == "RGBA":
+            # JPEG has no alpha; flatten onto white rather than black
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+    return out.getvalue()
+
+
+def render_variants(data, sizes, formats):
+    # {(size, fmt): bytes} of square, centre-cropped copies of the image.
+    # Sizes above the source's short side are left out rather than
+    # upscaled, so a small upload may get only some sizes, or none.
+    # Raises ValueError for data that is not a usable image.
+    if not HAS_PILLOW:
+        raise RuntimeError("Pillow is not installed; attach the Pillow layer to resize avatars")
+
+    try:
+        source = _open(data)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Not a readable image: {e}")
+
+    variants = {}
+    sizes = [size for size in sizes if size <= min(source.size)]
+    # Largest first, each one resized from the previous, so the full-size
+    # source is only resampled once
+    current = source
+    for size in sorted(sizes, reverse=True):
+        current = ImageOps.fit(current, (size, size), Image.LANCZOS)
+        for fmt in formats:
+            variants[(size, fmt)] = _encode(current, fmt)
+    return variants
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Key
+
+from common import dates
+from common.pagination import query_all
+from common.schedule import DaySlots, ScheduleIndex, conflict_summary
+
+# Exams and deadlines only store a start time. An exam blocks a class-length
+# slot; a submission deadline is a single minute.
+EXAM_DURATION_MIN = 60
+DEADLINE_DURATION_MIN = 1
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def parse_datetime(value):
+    try:
+        return dates.parse_datetime(value)
+    except ValueError:
+        return None
+
+
+def deadline_start(item):
+    # Items written with deadline_epoch need no parsing
+    if item.get("deadline_epoch") is not None:
+        return dates.from_epoch(item["deadline_epoch"])
+    return parse_datetime(item.get("deadline"))
+
+
+def _minutes(dt):
+    return (dt - _EPOCH) // timedelta(minutes=1)
+
+
+def exam_event(item):
+    start = deadline_start(item)
+    if start is None or not item.get("exam_date"):
+        return None
+    return {
+        "type": "exam",
+        "id": item.get("exam_id"),
+        "title": item.get("exam_title"),
+        "class_id": item.get("class_id"),
+        "start": start,
+        "end": start + timedelta(minutes=EXAM_DURATION_MIN)
+    }
+
+
+def submission_event(item):
+    start = deadline_start(item)
+    if start is None:
+        return None
+    return {
+        "type": "submission",
+        "id": item.get("task_id"),
+        "title": item.get("Title"),
+        "class_id": item.get("class_id"),
+        "start": start,
+        "end": start + timedelta(minutes=DEADLINE_DURATION_MIN)
+    }
+
+
+def event_summary(event):
+    return {
+        "type": event["type"],
+        "id": event["id"],
+        "title": event["title"],
+        "class_id": event["class_id"],
+        "start": event["start"].isoformat(),
+        "end": event["end"].isoformat()
+    }
+
+
+def _day_slices(start, end):
+    # Splits [start, end) into (weekday mask, start minute, end minute) per
+    # calendar day, so dated ranges can be looked up in the weekly index.
+    day = datetime(start.year, start.month, start.day)
+    while day < end:
+        next_day = day + timedelta(days=1)
+        lo = max(start, day) - day
+        hi = min(end, next_day) - day
+        yield 1 << day.weekday(), lo // timedelta(minutes=1), hi // timedelta(minutes=1)
+        day = next_day
+
+
+class Timeline:
+    # One user's calendar: weekly classes, plus exams and submission deadlines
+    # both on an absolute minute axis and folded onto the week (upcoming ones
+    # only) so a recurring class can be checked against them.
+
+    def __init__(self, now=None):
+        self.classes = ScheduleIndex()
+        self.class_codes = set()
+        self.dated = DaySlots()
+        self.weekly_events = ScheduleIndex()
+        self.now = now or datetime.utcnow()
+
+    def add_class(self, item):
+        self.class_codes.add(item.get("class_code"))
+        return self.classes.add_item(item)
+
+    def add_event(self, event):
+        if event is None:
+            return False
+
+        self.dated.insert(_minutes(event["start"]), _minutes(event["end"]), event)
+        if event["end"] > self.now:
+            for mask, start_min, end_min in _day_slices(event["start"], event["end"]):
+                self.weekly_events.add(event, mask, start_min, end_min)
+        return True
+
+    def class_conflicts(self, schedule, exclude_class_code=None):
+        # Returns (classes, events): overlapping classes block the write,
+        # upcoming exams and deadlines in the new slot are reported.
+        mask, start_min, end_min = schedule["day_mask"], schedule["start_min"], schedule["end_min"]
+
+        classes = [
+            conflict_summary(cls, days)
+            for cls, days in self.classes.conflicts(mask, start_min, end_min)
+            if cls.get("class_code") != exclude_class_code
+        ]
+        events = [
+            event_summary(event)
+            for event, _ in self.weekly_events.conflicts(mask, start_min, end_min)
+            if event["class_id"] != exclude_class_code
+        ]
+        return classes, events
+
+    def event_conflicts(self, event, exclude_id=None):
+        # Everything that overlaps a dated exam or deadline, except the item
+        # itself and meetings of the class it belongs to.
+        found = []
+        seen = set()
+        for mask, start_min, end_min in _day_slices(event["start"], event["end"]):
+            for cls, days in self.classes.conflicts(mask, start_min, end_min):
+                code = cls.get("class_code")
+                if code == event["class_id"] or code in seen:
+                    continue
+                seen.add(code)
+                found.append({"type": "class", **conflict_summary(cls, days)})
+
+        for other in self.dated.overlapping(_minutes(event["start"]), _minutes(event["end"])):
+            if other["id"] != exclude_id:
+                found.append(event_summary(other))
+        return found
+
+
+def load_timeline(classes_table, exams_table, submissions_table, user_id, now=None, classes=None):
+    # One key-condition query per table, then every lookup is served from the
+    # in-memory index. Callers that already hold the classes pass them in.
+    if classes is None:
+        classes = query_all(
+            classes_table,
+            KeyConditionExpression=Key("user_id").eq(user_id)
+        )
+    exams = query_all(
+        exams_table,
+        IndexName="user_id-index",
+        KeyConditionExpression=Key("user_id").eq(user_id),
+        ProjectionExpression="exam_id, exam_title, class_id, exam_date, deadline, deadline_epoch"
+    )
+    submissions = query_all(
+        submissions_table,
+        IndexName="user_id-index",
+        KeyConditionExpression=Key("user_id").eq(user_id),
+        ProjectionExpression="task_id, #title, class_id, deadline, deadline_epoch",
+        ExpressionAttributeNames={"#title": "Title"}
+    )
+
+    timeline = Timeline(now)
+    for item in classes:
+        timeline.add_class(item)
+    for item in exams:
+        timeline.add_event(exam_event(item))
+    for item in submissions:
+        timeline.add_event(submission_event(item))
+    return timeline
@@ -0,0 +1,185 @@
+from datetime import datetime
+from bisect import insort
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from common.availability import busy_bitmap, pack_bitmap
+from common.pagination import query_all
+from common.schedule import DAY_NAMES, item_schedule, mask_days
+from common.transactions import put_action
+
+# One item per user holding the week view: classes bucketed by weekday and
+# sorted by start time, plus the week packed as a busy-minute bitmap for group
+# availability. Class writes patch it; readers just get_item it. Its version
+# doubles as the per-user schedule version: addClass and updateClass commit the
+# class item and the patched timetable in one transaction conditioned on it.
+TIMETABLE_TABLE = "TIMETABLES"
+MAX_ATTEMPTS = 3
+
+
+def timetable_entry(item, schedule):
+    start_min, end_min, _ = schedule
+    return {
+        "class_code": item.get("class_code"),
+        "class_name": item.get("class_name"),
+        "time_start": item.get("time_start"),
+        "time_end": item.get("time_end"),
+        "start_min": start_min,
+        "end_min": end_min,
+        "professor": item.get("professor", ""),
+        "location": item.get("location", ""),
+        "version": item.get("version", 0)
+    }
+
+
+def _sort_key(entry):
+    return int(entry["start_min"]), entry["class_code"]
+
+
+def empty_days():
+    return {day: [] for day in DAY_NAMES}
+
+
+def add_to_days(days, item):
+    schedule = item_schedule(item)
+    if schedule is None:
+        return
+    entry = timetable_entry(item, schedule)
+    for d in mask_days(schedule[2]):
+        insort(days[DAY_NAMES[d]], entry, key=_sort_key)
+
+
+def remove_from_days(days, class_codes):
+    for day in DAY_NAMES:
+        days[day] = [e for e in days.get(day, []) if e["class_code"] not in class_codes]
+
+
+def build_timetable(user_id, classes):
+    days = empty_days()
+    for item in classes:
+        add_to_days(days, item)
+    return {
+        "user_id": user_id,
+        "days": days,
+        "busy_bits": pack_bitmap(busy_bitmap(days)),
+        "version": 1,
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
+
+def _create_timetable(classes_table, timetable_table, user_id):
+    # Builds the user's timetable from CLASSES and stores it only if none
+    # exists yet. A class write committed since CLASSES was read has stored
+    # its own (newer) timetable, which must not be overwritten; returns
+    # (doc, created).
+    classes = query_all(classes_table, KeyConditionExpression=Key("user_id").eq(user_id))
+    doc = build_timetable(user_id, classes)
+    try:
+        timetable_table.put_item(Item=doc, ConditionExpression="attribute_not_exists(user_id)")
+        return doc, True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+    return timetable_table.get_item(Key={"user_id": user_id}, ConsistentRead=True).get("Item") or doc, False
+
+
+def rebuild_timetable(classes_table, timetable_table, user_id):
+    # For readers of a user with no stored timetable: the one now stored
+    return _create_timetable(classes_table, timetable_table, user_id)[0]
+
+
+def load_schedule(classes_table, timetable_table, user_id):
+    # The one read on the class write path. Returns (timetable, version read);
+    # version 0 means nothing is stored yet and the timetable was built from
+    # CLASSES in memory, to be created by the caller's write.
+    doc = timetable_table.get_item(Key={"user_id": user_id}, ConsistentRead=True).get("Item")
+    if doc:
+        return doc, doc.get("version", 0)
+
+    classes = query_all(classes_table, KeyConditionExpression=Key("user_id").eq(user_id))
+    doc = build_timetable(user_id, classes)
+    doc["version"] = 0
+    return doc, 0
+
+
+def timetable_classes(doc):
+    # Rebuilds the class items from the day buckets, keyed by class_code
+    classes = {}
+    for d, day in enumerate(DAY_NAMES):
+        for entry in doc.get("days", {}).get(day, []):
+            code = entry["class_code"]
+            if code not in classes:
+                classes[code] = {
+                    "user_id": doc["user_id"],
+                    **entry,
+                    "days_of_week": [],
+                    "day_mask": 0
+                }
+            classes[code]["days_of_week"].append(day)
+            classes[code]["day_mask"] |= 1 << d
+    return classes
+
+
+def patch_timetable(doc, removed_codes=(), added_items=()):
+    # Returns a new timetable with only the given classes changed. An update
+    # is a remove plus an add of the same code.
+    days = {day: list(doc.get("days", {}).get(day, [])) for day in DAY_NAMES}
+    remove_from_days(days, set(removed_codes) | {item.get("class_code") for item in added_items})
+    for item in added_items:
+        add_to_days(days, item)
+
+    return {
+        **doc,
+        "days": days,
+        "busy_bits": pack_bitmap(busy_bitmap(days)),
+        "version": doc.get("version", 0) + 1,
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
+
+def timetable_put_action(doc, expected_version):
+    if expected_version:
+        return put_action(TIMETABLE_TABLE, doc, "version = :expected_version",
+                          values={":expected_version": expected_version})
+    return put_action(TIMETABLE_TABLE, doc, "attribute_not_exists(user_id)")
+
+
+def apply_class_changes(timetable_table, classes_table, user_id, removed_codes=(), added_items=()):
+    # For writers outside a transaction: patches the stored week after the
+    # class write, conditioned on the version read, retrying on a race.
+    for _ in range(MAX_ATTEMPTS):
+        doc = timetable_table.get_item(Key={"user_id": user_id}, ConsistentRead=True).get("Item")
+        if not doc:
+            # Never built for this user: the class write already landed, so a
+            # full rebuild includes it. If another writer stored one first,
+            # patch that instead.
+            if _create_timetable(classes_table, timetable_table, user_id)[1]:
+                return
+            continue
+
+        version = doc.get("version", 0)
+        try:
+            timetable_table.put_item(
+                Item=patch_timetable(doc, removed_codes, added_items),
+                ConditionExpression=Attr("version").eq(version)
+            )
+            return
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    raise Exception("Timetable changed too often concurrently")
+
+
+def sync_timetable(timetable_table, classes_table, user_id, removed_codes=(), added_items=()):
+    # Called after the class write has succeeded, so failures must not turn it
+    # into an error response. Dropping the stored week makes the next read
+    # rebuild it instead of serving a stale one.
+    try:
+        apply_class_changes(timetable_table, classes_table, user_id, removed_codes, added_items)
+    except Exception as e:
+        print(f"Timetable update failed for {user_id}: {str(e)}")
+        try:
+            timetable_table.delete_item(Key={"user_id": user_id})
+        except Exception as e:
+            print(f"Timetable reset failed for {user_id}: {str(e)}")
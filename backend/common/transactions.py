@@ -0,0 +1,52 @@
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# TransactWriteItems is only on the low-level client, which takes typed
+# attribute values ({"S": ...}) instead of plain Python ones.
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def typed(values):
+    return {k: _serializer.serialize(v) for k, v in values.items()}
+
+
+def untyped(values):
+    # The reverse of typed, for items the low-level client returns
+    return {k: _deserializer.deserialize(v) for k, v in values.items()}
+
+
+def put_action(table_name, item, condition=None, names=None, values=None):
+    action = {"TableName": table_name, "Item": typed(item)}
+    return {"Put": _with_condition(action, condition, names, values)}
+
+
+def update_action(table_name, key, update_expression, names=None, values=None, condition=None,
+                  return_old_on_failure=False):
+    action = {"TableName": table_name, "Key": typed(key), "UpdateExpression": update_expression}
+    if return_old_on_failure:
+        # The item comes back in the cancellation reason, see cancelled_item
+        action["ReturnValuesOnConditionCheckFailure"] = "ALL_OLD"
+    return {"Update": _with_condition(action, condition, names, values)}
+
+
+def delete_action(table_name, key, condition=None, names=None, values=None):
+    action = {"TableName": table_name, "Key": typed(key)}
+    return {"Delete": _with_condition(action, condition, names, values)}
+
+
+def _with_condition(action, condition, names, values):
+    if condition:
+        action["ConditionExpression"] = condition
+    if names:
+        action["ExpressionAttributeNames"] = names
+    if values:
+        action["ExpressionAttributeValues"] = typed(values)
+    return action
+
+
+def cancellation_codes(error):
+    # One code per action, in request order ("None" for actions that were
+    # fine), when a transaction is cancelled
+    if error.response["Error"]["Code"] != "TransactionCanceledException":
+        return None
+    return [reason.get("Code") for reason in error.response.get("CancellationReasons", [])]
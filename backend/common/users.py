@@ -0,0 +1,54 @@
+from boto3.dynamodb.conditions import Key
+
+from common.transactions import delete_action, put_action
+
+USERS_TABLE = "users"
+
+# One item per registered email (partition key email), written in the same
+# transaction as the user. Its attribute_not_exists condition is what makes
+# emails unique: a second registration fails inside the transaction.
+EMAIL_TABLE = "USER_EMAILS"
+
+# GSI on users (partition key email) that login reads. It projects
+# user_id, email and password_hash, so login is one query.
+EMAIL_INDEX = "email-index"
+
+
+def normalize_email(email):
+    return email.strip().lower() if isinstance(email, str) else email
+
+
+def claim_email_action(email, user_id):
+    return put_action(
+        EMAIL_TABLE,
+        {"email": email, "user_id": user_id},
+        "attribute_not_exists(email)"
+    )
+
+
+def release_email_action(email, user_id):
+    # Only the owner's claim is removed. Accounts from before USER_EMAILS may
+    # have no claim at all, which is fine too.
+    return delete_action(
+        EMAIL_TABLE,
+        {"email": email},
+        "attribute_not_exists(email) OR user_id = :user_id",
+        values={":user_id": user_id}
+    )
+
+
+def find_user_by_email(users_table, email):
+    # Emails are stored normalized; accounts from before that may still have
+    # the address as typed, so that spelling is tried second
+    candidates = [normalize_email(email)]
+    if email not in candidates:
+        candidates.append(email)
+    for candidate in candidates:
+        items = users_table.query(
+            IndexName=EMAIL_INDEX,
+            KeyConditionExpression=Key("email").eq(candidate),
+            Limit=1
+        ).get("Items", [])
+        if items:
+            return items[0]
+    return None
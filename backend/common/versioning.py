@@ -0,0 +1,71 @@
+from boto3.dynamodb.types import TypeDeserializer
+
+# Every CLASSES, Exams and Submissions item carries a "version": 1 when it is
+# created, one more on every update. Clients get it back as an ETag and can
+# send it as If-Match; the write is then conditioned on the item still being
+# at that version, and fails with 412 otherwise. Items written before
+# versions existed count as version 0.
+VERSION_INCREMENT = "#version = if_not_exists(#version, :zero) + :one"
+VERSION_NAMES = {"#version": "version"}
+VERSION_VALUES = {":zero": 0, ":one": 1}
+
+_deserializer = TypeDeserializer()
+
+
+def etag(version):
+    return f'"{int(version or 0)}"'
+
+
+def get_header(headers, name):
+    # API Gateway passes header names as the client sent them
+    wanted = name.lower().replace("-", "_")
+    for key, value in (headers or {}).items():
+        if key.lower().replace("-", "_") == wanted:
+            return value
+    return None
+
+
+def parse_etag(value):
+    # Returns the version in an If-Match / If-None-Match value, or None for
+    # a missing value or "*"
+    if value is None:
+        return None
+    value = value.strip()
+    if value in ("", "*"):
+        return None
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise ValueError(f"Invalid ETag: {value}")
+
+
+def if_match(headers):
+    return parse_etag(get_header(headers, "If-Match"))
+
+
+def version_condition(expected):
+    # Condition expression and values for "still at version expected"
+    if expected == 0:
+        return "attribute_not_exists(#version)", {}
+    return "#version = :expected_version", {":expected_version": expected}
+
+
+def failed_item(error):
+    # The item as it was when a write with
+    # ReturnValuesOnConditionCheckFailure="ALL_OLD" failed its condition, or
+    # None if there was no item
+    item = error.response.get("Item")
+    if not item:
+        return None
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
+
+
+def cancelled_item(error, index):
+    # Same as failed_item for action number index of a cancelled transaction
+    reasons = error.response.get("CancellationReasons") or []
+    item = reasons[index].get("Item") if index < len(reasons) else None
+    if not item:
+        return None
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
@@ -0,0 +1,76 @@
+import json
+import boto3
+
+from common import exams, submissions
+from common.pagination import decode_cursor, encode_cursor
+
+dynamodb = boto3.resource("dynamodb")
+
+# (table, key attributes, module with derived_fields / DERIVED_FIELDS), in
+# the order they are backfilled
+TARGETS = [
+    ("Exams", ["exam_id"], exams),
+    ("Submissions", ["task_id", "user_id"], submissions),
+]
+
+# Stop early enough to report the cursor before Lambda times out
+MIN_REMAINING_MS = 10000
+
+
+def lambda_handler(event, context):
+    # One-off job: writes the computed fields (deadline_epoch, date_epoch,
+    # due_bucket / due_at, and user_status / deadline_sort on submissions) onto exams and
+    # submissions stored before they existed. Items that already match are
+    # not written. Re-invoke with the returned "cursor" until it comes back
+    # as null.
+    event = event or {}
+
+    try:
+        position = decode_cursor(event.get("cursor")) or {}
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    names = [name for name, _, _ in TARGETS]
+    if position and position.get("table") not in names:
+        return {"status": "error", "message": "Invalid cursor"}
+
+    target_index = names.index(position["table"]) if position else 0
+    start_key = position.get("key")
+    updated = 0
+
+    while target_index < len(TARGETS):
+        name, key_fields, module = TARGETS[target_index]
+        table = dynamodb.Table(name)
+        fields = list(dict.fromkeys(key_fields + list(module.DERIVED_FROM) + list(module.DERIVED_FIELDS)))
+        scan_kwargs = {
+            "ProjectionExpression": ", ".join(f"#f{i}" for i in range(len(fields))),
+            "ExpressionAttributeNames": {f"#f{i}": field for i, field in enumerate(fields)}
+        }
+
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = start_key
+        response = table.scan(**scan_kwargs)
+
+        for item in response.get("Items", []):
+            key = {k: item[k] for k in key_fields}
+            synced = module.sync_derived(table, key, item)
+            if synced is not item:
+                updated += 1
+
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key:
+            target_index += 1
+        if context and context.get_remaining_time_in_millis() < MIN_REMAINING_MS:
+            break
+
+    cursor = None
+    if target_index < len(TARGETS):
+        cursor = encode_cursor({"table": TARGETS[target_index][0], "key": start_key})
+
+    result = {
+        "status": "success",
+        "updated": updated,
+        "cursor": cursor
+    }
+    print(json.dumps(result))
+    return result
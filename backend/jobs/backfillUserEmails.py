@@ -0,0 +1,66 @@
+import json
+import boto3
+from botocore.exceptions import ClientError
+
+from common.pagination import decode_cursor, encode_cursor
+from common.users import EMAIL_TABLE, USERS_TABLE, normalize_email
+
+dynamodb = boto3.resource("dynamodb")
+users_table = dynamodb.Table(USERS_TABLE)
+emails_table = dynamodb.Table(EMAIL_TABLE)
+
+# Stop early enough to report the cursor before Lambda times out
+MIN_REMAINING_MS = 10000
+
+
+def lambda_handler(event, context):
+    # One-off job: writes the USER_EMAILS claim for accounts registered before
+    # it existed, so their emails can't be registered again. Emails already
+    # claimed by another account are reported, not changed. Re-invoke with the
+    # returned "cursor" until it comes back as null.
+    event = event or {}
+    scan_kwargs = {"ProjectionExpression": "user_id, email"}
+
+    try:
+        start_key = decode_cursor(event.get("cursor"))
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    claimed = 0
+    duplicates = []
+
+    while True:
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = start_key
+        response = users_table.scan(**scan_kwargs)
+
+        for item in response.get("Items", []):
+            email = normalize_email(item.get("email"))
+            if not email:
+                continue
+            try:
+                emails_table.put_item(
+                    Item={"email": email, "user_id": item["user_id"]},
+                    ConditionExpression="attribute_not_exists(email) OR user_id = :user_id",
+                    ExpressionAttributeValues={":user_id": item["user_id"]}
+                )
+                claimed += 1
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                duplicates.append({"user_id": item["user_id"], "email": email})
+
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key:
+            break
+        if context and context.get_remaining_time_in_millis() < MIN_REMAINING_MS:
+            break
+
+    result = {
+        "status": "success",
+        "claimed": claimed,
+        "duplicates": duplicates,
+        "cursor": encode_cursor(start_key)
+    }
+    print(json.dumps(result))
+    return result
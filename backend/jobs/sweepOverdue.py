@@ -0,0 +1,195 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import boto3
+from botocore.exceptions import ClientError
+
+from common.dates import from_epoch, to_epoch
+from common.pagination import decode_cursor, encode_cursor
+from common.submissions import user_status
+from common.transactions import cancellation_codes, typed, untyped, update_action
+from common.versioning import VERSION_INCREMENT, VERSION_NAMES, VERSION_VALUES
+
+dynamodb = boto3.resource("dynamodb")
+checkpoints_table = dynamodb.Table("JOB_CHECKPOINTS")
+# The low-level client is thread-safe, unlike the resource, so every
+# segment's thread shares it
+client = dynamodb.meta.client
+
+JOB_NAME = "sweepOverdue"
+
+# Key attributes per swept table
+TARGETS = {
+    "Exams": ["exam_id"],
+    "Submissions": ["task_id", "user_id"],
+}
+
+# Each table is scanned as TOTAL_SEGMENTS parallel segments
+TOTAL_SEGMENTS = 8
+MAX_WORKERS = 16
+PAGE_SIZE = 500
+TRANSACTION_SIZE = 25
+MAX_ATTEMPTS = 3
+
+# Stop early enough to save the checkpoint before Lambda times out
+MIN_REMAINING_MS = 15000
+
+DONE = "done"
+
+
+def overdue_action(table_name, item, now_epoch):
+    # pending -> overdue, only if the item is still pending and past due
+    key = {k: item[k] for k in TARGETS[table_name]}
+    update_expression = f"SET #status = :overdue, {VERSION_INCREMENT}"
+    names = {"#status": "status", "#deadline_epoch": "deadline_epoch", **VERSION_NAMES}
+    values = {":overdue": "overdue", ":pending": "pending", ":now": now_epoch, **VERSION_VALUES}
+    if table_name == "Submissions":
+        # Moves the item to the overdue part of user_status-deadline_sort-index
+        update_expression += ", #user_status = :user_status"
+        names["#user_status"] = "user_status"
+        values[":user_status"] = user_status(item["user_id"], "overdue")
+    return update_action(
+        table_name,
+        key,
+        update_expression,
+        names=names,
+        values=values,
+        condition="#status = :pending AND #deadline_epoch < :now"
+    )
+
+
+def flip_overdue(client, table_name, items, now_epoch):
+    # Conditional updates, TRANSACTION_SIZE per transaction. Items that are no
+    # longer pending or overdue fail their condition and are dropped; the rest
+    # of a cancelled transaction is retried. Returns (flipped, keys of the
+    # items still not flipped after MAX_ATTEMPTS).
+    flipped = 0
+    failed = []
+    for start in range(0, len(items), TRANSACTION_SIZE):
+        chunk = items[start:start + TRANSACTION_SIZE]
+        for _ in range(MAX_ATTEMPTS):
+            if not chunk:
+                break
+            try:
+                client.transact_write_items(
+                    TransactItems=[overdue_action(table_name, item, now_epoch) for item in chunk]
+                )
+                flipped += len(chunk)
+                break
+            except ClientError as e:
+                codes = cancellation_codes(e)
+                if not codes:
+                    raise
+                chunk = [item for item, code in zip(chunk, codes) if code != "ConditionalCheckFailed"]
+        else:
+            failed.extend({k: item[k] for k in TARGETS[table_name]} for item in chunk)
+    return flipped, failed
+
+
+def sweep_segment(table_name, segment, cursor, now_epoch, should_stop):
+    # Scans one segment from cursor until it ends or time runs short.
+    # Returns (position to resume from, items flipped, keys that failed).
+    fields = TARGETS[table_name]
+    scan_kwargs = {
+        "TableName": table_name,
+        "Segment": segment,
+        "TotalSegments": TOTAL_SEGMENTS,
+        "Limit": PAGE_SIZE,
+        "FilterExpression": "#status = :pending AND #deadline_epoch < :now",
+        "ProjectionExpression": ", ".join(f"#f{i}" for i in range(len(fields))),
+        "ExpressionAttributeNames": {
+            "#status": "status",
+            "#deadline_epoch": "deadline_epoch",
+            **{f"#f{i}": field for i, field in enumerate(fields)}
+        },
+        "ExpressionAttributeValues": typed({":pending": "pending", ":now": now_epoch})
+    }
+
+    start_key = decode_cursor(cursor)
+    flipped = 0
+    failed = []
+    while True:
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = typed(start_key)
+        response = client.scan(**scan_kwargs)
+        items = [untyped(item) for item in response.get("Items", [])]
+        count, chunk_failed = flip_overdue(client, table_name, items, now_epoch)
+        flipped += count
+        failed.extend(chunk_failed)
+
+        # Cursors are saved untyped, as every other cursor is
+        start_key = response.get("LastEvaluatedKey")
+        start_key = start_key and untyped(start_key)
+        if not start_key:
+            return DONE, flipped, failed
+        if should_stop():
+            return encode_cursor(start_key), flipped, failed
+
+
+def load_checkpoint(now_epoch):
+    checkpoint = checkpoints_table.get_item(Key={"job": JOB_NAME}, ConsistentRead=True).get("Item")
+    if checkpoint and int(checkpoint.get("total_segments", 0)) == TOTAL_SEGMENTS:
+        # Finish the interrupted run with its own cut-off time
+        return checkpoint
+    return {
+        "job": JOB_NAME,
+        "now_epoch": now_epoch,
+        "total_segments": TOTAL_SEGMENTS,
+        "positions": {
+            table_name: {str(segment): "" for segment in range(TOTAL_SEGMENTS)}
+            for table_name in TARGETS
+        }
+    }
+
+
+def lambda_handler(event, context):
+    # Scheduled job: marks pending exams and submissions whose deadline has
+    # passed as overdue. Every (table, segment) pair is scanned on its own
+    # thread. A run that runs short of time saves each segment's position in
+    # JOB_CHECKPOINTS and the next run carries on from there.
+    def should_stop():
+        return bool(context) and context.get_remaining_time_in_millis() < MIN_REMAINING_MS
+
+    checkpoint = load_checkpoint(to_epoch(datetime.utcnow()))
+    now_epoch = int(checkpoint["now_epoch"])
+    positions = checkpoint["positions"]
+
+    pending = [
+        (table_name, int(segment), cursor)
+        for table_name, segments in positions.items()
+        for segment, cursor in segments.items()
+        if cursor != DONE
+    ]
+
+    def run(task):
+        table_name, segment, cursor = task
+        return table_name, segment, sweep_segment(table_name, segment, cursor, now_epoch, should_stop)
+
+    flipped = {table_name: 0 for table_name in TARGETS}
+    # Items a segment could not flip stay pending and past due, so the next
+    # full sweep finds them again; until then they are reported here
+    failed = {table_name: [] for table_name in TARGETS}
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pending))) as pool:
+            for table_name, segment, (position, count, segment_failed) in pool.map(run, pending):
+                positions[table_name][str(segment)] = position
+                flipped[table_name] += count
+                failed[table_name].extend(segment_failed)
+
+    finished = all(cursor == DONE for segments in positions.values() for cursor in segments.values())
+    if finished:
+        checkpoints_table.delete_item(Key={"job": JOB_NAME})
+    else:
+        checkpoints_table.put_item(Item=checkpoint)
+
+    result = {
+        "status": "partial" if any(failed.values()) else "success",
+        "cutoff": from_epoch(now_epoch).isoformat(),
+        "overdue_exams": flipped["Exams"],
+        "overdue_submissions": flipped["Submissions"],
+        "failed_exams": failed["Exams"],
+        "failed_submissions": failed["Submissions"],
+        "finished": finished
+    }
+    print(json.dumps(result))
+    return result